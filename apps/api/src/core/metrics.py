@@ -0,0 +1,164 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# with several uvicorn workers set PROMETHEUS_MULTIPROC_DIR: /metrics then
+# aggregates counters / histograms of all workers (stats gauges stay per worker)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# seconds; stages go down to the compiled scorer's microseconds
+_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUESTS = Counter(
+    "churn_api_http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "churn_api_http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "churn_api_http_requests_in_progress", "HTTP requests being served", ["method"], multiprocess_mode="livesum"
+)
+STAGE_LATENCY = Histogram(
+    "churn_api_stage_duration_seconds",
+    "Latency of one stage of a handler (model fetch, sanitize, predict_proba, DB commit, ...)",
+    ["endpoint", "stage"],
+    buckets=_BUCKETS,
+)
+
+MODEL_INFO = Gauge(
+    "churn_api_model_info", "1 for the model version currently serving latest traffic", ["model_version"],
+    multiprocess_mode="max",
+)
+MODEL_RELOAD_SECONDS = Histogram(
+    "churn_api_model_reload_seconds", "Model reload duration (download + deserialize + warmup)", ["status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+MODEL_LAST_RELOAD_SECONDS = Gauge(
+    "churn_api_model_last_reload_seconds", "Duration of the last model reload", ["phase"], multiprocess_mode="max"
+)
+
+DRIFT_SCORE = Gauge(
+    "churn_api_drift_score", "Last drift score per feature (PSI numeric, L1 categorical)", ["source", "feature", "metric"],
+    multiprocess_mode="max",
+)
+DRIFT_DETECTED = Gauge(
+    "churn_api_drift_detected", "1 if the last drift check flagged any feature", ["source"], multiprocess_mode="max"
+)
+DRIFT_DRIFTED_FEATURES = Gauge(
+    "churn_api_drift_drifted_features", "Number of features over threshold in the last drift check", ["source"],
+    multiprocess_mode="max",
+)
+
+
+@contextmanager
+def stage(endpoint: str, name: str) -> Iterator[None]:
+    """
+    with stage("predict", "sanitize"): ...  -> churn_api_stage_duration_seconds
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(endpoint, name).observe(time.perf_counter() - start)
+
+
+async def metrics_middleware(request: Request, call_next):
+    method = request.method
+    HTTP_IN_PROGRESS.labels(method).inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        HTTP_IN_PROGRESS.labels(method).dec()
+        # route template (/predict/{x}), not the raw path: keeps label cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.labels(method, path, str(status)).inc()
+        HTTP_LATENCY.labels(method, path).observe(elapsed)
+
+
+def set_model_version(model_version: str) -> None:
+    MODEL_INFO.clear()
+    MODEL_INFO.labels(model_version).set(1)
+
+
+def record_reload(status: Dict[str, Any]) -> None:
+    total = (status.get("load_seconds") or 0.0) + (status.get("warmup_seconds") or 0.0)
+    MODEL_RELOAD_SECONDS.labels(status.get("status", "unknown")).observe(total)
+    for phase in ("load_seconds", "warmup_seconds"):
+        if phase in status:
+            MODEL_LAST_RELOAD_SECONDS.labels(phase.replace("_seconds", "")).set(status[phase])
+
+
+def record_drift(source: str, summary: Dict[str, Any], details: Dict[str, Any]) -> None:
+    for feature, d in details.get("numeric", {}).items():
+        DRIFT_SCORE.labels(source, feature, "psi").set(d["psi"])
+    for feature, d in details.get("categorical", {}).items():
+        DRIFT_SCORE.labels(source, feature, "l1").set(d["l1"])
+    DRIFT_DETECTED.labels(source).set(1 if summary.get("drift_detected") else 0)
+    DRIFT_DRIFTED_FEATURES.labels(source).set(len(summary.get("drifted_features", [])))
+
+
+class StatsCollector:
+    """
+    Exposes the numeric top-level fields of an existing stats() dict
+    (registry, log writer, batcher, caches, ...) as gauges at scrape time:
+    churn_api_<prefix>_<key>.
+    """
+
+    def __init__(self, prefix: str, fn: Callable[[], Optional[Dict[str, Any]]]):
+        self.prefix = prefix
+        self.fn = fn
+
+    def collect(self):
+        try:
+            stats = self.fn() or {}
+        except Exception:
+            return
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                yield GaugeMetricFamily(f"churn_api_{self.prefix}_{key}", f"{self.prefix} stats: {key}", value=value)
+
+
+_stats_collectors: List[StatsCollector] = []
+
+
+def register_stats(prefix: str, fn: Callable[[], Optional[Dict[str, Any]]]) -> None:
+    collector = StatsCollector(prefix, fn)
+    _stats_collectors.append(collector)
+    if not PROMETHEUS_MULTIPROC_DIR:
+        REGISTRY.register(collector)
+
+
+def metrics_response() -> Response:
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        # per-request registry, as prometheus_client's multiprocess docs require
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _stats_collectors:
+            registry.register(collector)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest(REGISTRY)
+    return Response(content=data, media_type=CONTENT_TYPE_LATEST)
@@ -4,7 +4,8 @@ from fastapi import Header, HTTPException, status
 API_KEY = os.getenv("API_KEY")
 
 
-def verify_api_key(x_api_key: str = Header(...)):
+# async: no I/O, so it runs on the event loop instead of taking a threadpool slot
+async def verify_api_key(x_api_key: str = Header(...)):
     if API_KEY is None:
         raise RuntimeError("API_KEY is not set")
 
@@ -0,0 +1,45 @@
+import os
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.db.session import get_database_url
+
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20"))
+
+
+def get_async_database_url() -> str:
+    # same database as the sync engine, async driver
+    url = get_database_url()
+    return url.replace("+psycopg2", "+asyncpg", 1).replace("sqlite:", "sqlite+aiosqlite:", 1)
+
+
+# created on first use: importing the app must not require the async driver
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = get_async_database_url()
+        kwargs = {} if url.startswith("sqlite") else {
+            "pool_pre_ping": True,
+            "pool_size": ASYNC_DB_POOL_SIZE,
+            "max_overflow": ASYNC_DB_MAX_OVERFLOW,
+        }
+        _async_engine = create_async_engine(url, **kwargs)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_session_factory() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, case, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from src.db.models import ChurnLabel, Prediction, ShadowPrediction
+
+
+def bulk_insert_predictions(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserts many Prediction rows in one multi-row INSERT ... RETURNING id
+    and returns the new ids in input order.
+    """
+    if not rows:
+        return []
+
+    stmt = insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True)
+    ids = session.execute(stmt, rows).scalars().all()
+    session.commit()
+    return list(ids)
+
+
+def insert_predictions(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Inserts many Prediction rows without reading anything back
+    (executemany, batched into multi-row VALUES by the driver).
+    """
+    if not rows:
+        return
+
+    session.execute(insert(Prediction), rows)
+    session.commit()
+
+
+def insert_shadow_predictions(session: Session, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+
+    session.execute(insert(ShadowPrediction), rows)
+    session.commit()
+
+
+def upsert_labels(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Inserts ChurnLabel rows; a label for a request_id that already has one
+    replaces it (and moves its created_at, so the next incremental run sees it).
+    Returns the number of labels written.
+    """
+    # last label wins within a batch too (a multi-row upsert can't touch a row twice)
+    rows = list({row["request_id"]: row for row in rows}.values())
+    if not rows:
+        return 0
+
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ChurnLabel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChurnLabel.request_id],
+        set_={"churn": stmt.excluded.churn, "created_at": stmt.excluded.created_at},
+    )
+    session.execute(stmt, rows)
+    session.commit()
+    return len(rows)
+
+
+def shadow_comparison(session: Session, since: datetime, model_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Per (shadow version, serving version): requests scored, agreement rate with
+    the served prediction, and mean probabilities of both models.
+    Served probabilities aren't logged, so only the shadow side has one.
+    """
+    agree = case((ShadowPrediction.prediction == Prediction.prediction, 1), else_=0)
+    q = (
+        select(
+            ShadowPrediction.model_version,
+            ShadowPrediction.serving_version,
+            func.count(),
+            func.avg(agree),
+            func.avg(ShadowPrediction.prediction),
+            func.avg(Prediction.prediction),
+            func.avg(ShadowPrediction.probability),
+        )
+        .join(
+            Prediction,
+            and_(
+                Prediction.request_id == ShadowPrediction.request_id,
+                # lets Postgres prune prediction partitions older than the window
+                Prediction.created_at >= since,
+            ),
+        )
+        .where(ShadowPrediction.created_at >= since)
+        .group_by(ShadowPrediction.model_version, ShadowPrediction.serving_version)
+    )
+    if model_version:
+        q = q.where(ShadowPrediction.model_version == model_version)
+
+    return [
+        {
+            "model_version": version,
+            "serving_version": serving,
+            "n": int(n),
+            "agreement": float(agreement),
+            "shadow_positive_rate": float(shadow_rate),
+            "serving_positive_rate": float(serving_rate),
+            "shadow_mean_probability": float(shadow_p),
+        }
+        for version, serving, n, agreement, shadow_rate, serving_rate, shadow_p in session.exec(q).all()
+    ]
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.ml.drift import DriftEngine
+
+
+def _window_sql(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    model_version: Optional[str],
+    limit: Optional[int],
+) -> Tuple[str, Dict[str, Any]]:
+    where, params = [], {}
+    if model_version is not None:
+        where.append("model_version = :model_version")
+        params["model_version"] = model_version
+    if since is not None:
+        where.append("created_at >= :since")
+        params["since"] = since
+    if until is not None:
+        where.append("created_at < :until")
+        params["until"] = until
+
+    sql = "SELECT features FROM predictions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if limit is not None:
+        sql += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+        params["limit"] = limit
+    return sql, params
+
+
+def drift_counts(
+    session: Session,
+    engine: DriftEngine,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    model_version: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray], int]:
+    """
+    Histogram counts of logged predictions computed inside Postgres.
+
+    One statement scans the window once (CTE) and returns only aggregates:
+    width_bucket() over the profile edges per numeric feature and
+    GROUP BY value per categorical feature.
+
+    Returns (num_counts, n_finite, cat_counts, n_current) in the layout
+    DriftEngine.report() takes.
+    """
+    window, params = _window_sql(since, until, model_version, limit)
+    parts = ["SELECT 't' AS kind, 0 AS col, 0 AS bucket, NULL AS value, count(*) AS n FROM w"]
+
+    for i, c in enumerate(engine.num_cols):
+        edges = engine.edges[i]
+        if edges is None:
+            continue
+        params[f"nk{i}"] = c
+        params[f"ne{i}"] = edges.tolist()
+        params[f"nh{i}"] = float(edges[-1])
+        params[f"nb{i}"] = int(engine.n_bins[i])
+        # width_bucket: 1..nb inside [e0, e_k), 0 below, nb+1 from e_k up;
+        # the last edge is inclusive like np.histogram
+        parts.append(
+            f"SELECT 'n', {i}, CASE WHEN x = :nh{i} THEN :nb{i} "
+            f"ELSE width_bucket(x, CAST(:ne{i} AS float8[])) END, NULL, count(*) "
+            f"FROM (SELECT (features->>:nk{i})::float8 AS x FROM w) t WHERE x IS NOT NULL GROUP BY 3"
+        )
+
+    for i, c in enumerate(engine.cat_cols):
+        params[f"ck{i}"] = c
+        parts.append(
+            f"SELECT 'c', {i}, 0, coalesce(features->>:ck{i}, ''), count(*) FROM w GROUP BY 4"
+        )
+
+    sql = f"WITH w AS MATERIALIZED ({window}) " + " UNION ALL ".join(parts)
+    rows = session.execute(text(sql), params).all()
+
+    num_counts = np.zeros((len(engine.num_cols), engine.width))
+    n_finite = np.zeros(len(engine.num_cols))
+    cat_maps: List[Dict[str, float]] = [{} for _ in engine.cat_cols]
+    n_current = 0
+
+    for kind, col, bucket, value, n in rows:
+        if kind == "t":
+            n_current = int(n)
+        elif kind == "n":
+            n_finite[col] += n
+            if 1 <= bucket <= engine.n_bins[col]:
+                num_counts[col, bucket - 1] += n
+        else:
+            cat_maps[col][value] = float(n)
+
+    cat_counts = [engine.categorical_counts_from_mapping(i, m) for i, m in enumerate(cat_maps)]
+    return num_counts, n_finite, cat_counts, n_current
@@ -0,0 +1,182 @@
+"""
+Ordered schema migrations, applied by init_db() at startup.
+
+Each migration runs once, in its own transaction, and is recorded in
+schema_migrations. New schema changes go at the end of MIGRATIONS; never
+edit one that has shipped.
+"""
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from src.db.partitions import add_months, create_partition, ensure_partitions, month_start
+
+# arbitrary key for pg_advisory_xact_lock, serializes migrations across workers / pods
+_LOCK_KEY = 7240311
+
+
+def _0001_baseline(conn: Connection) -> None:
+    # same tables SQLModel.metadata.create_all used to create
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS predictions (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            model_version VARCHAR NOT NULL,
+            features JSONB,
+            prediction INTEGER NOT NULL
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_predictions_model_version ON predictions (model_version)"))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS drift_runs (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            model_version VARCHAR NOT NULL,
+            n_current INTEGER NOT NULL,
+            summary JSONB,
+            details JSONB
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_drift_runs_model_version ON drift_runs (model_version)"))
+
+
+def _0002_request_id(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE predictions ADD COLUMN IF NOT EXISTS request_id VARCHAR"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_predictions_request_id ON predictions (request_id)"))
+
+
+def _0003_partition_predictions(conn: Connection) -> None:
+    """
+    predictions -> RANGE (created_at) partitioned table with monthly partitions.
+    The primary key becomes (id, created_at) since it must contain the partition key;
+    ids keep coming from the same sequence, widened from SERIAL's int4 to bigint.
+    """
+    conn.execute(text("ALTER TABLE predictions RENAME TO predictions_legacy"))
+    for idx in ("predictions_pkey", "ix_predictions_model_version", "ix_predictions_request_id"):
+        conn.execute(text(f"ALTER INDEX IF EXISTS {idx} RENAME TO {idx.replace('predictions', 'predictions_legacy', 1)}"))
+    conn.execute(text("ALTER SEQUENCE predictions_id_seq OWNED BY NONE"))
+    # an int4 sequence would still stop at 2^31 - 1 behind the BIGINT column
+    conn.execute(text("ALTER SEQUENCE predictions_id_seq AS bigint NO MAXVALUE"))
+
+    conn.execute(text("""
+        CREATE TABLE predictions (
+            id BIGINT NOT NULL DEFAULT nextval('predictions_id_seq'),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            model_version VARCHAR NOT NULL,
+            request_id VARCHAR,
+            features JSONB,
+            prediction INTEGER NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    conn.execute(text("ALTER SEQUENCE predictions_id_seq OWNED BY predictions.id"))
+
+    # /predict/latest and row-window drift: newest first
+    conn.execute(text("CREATE INDEX ix_predictions_created_at_id ON predictions (created_at DESC, id DESC)"))
+    # drift windows per model version
+    conn.execute(text(
+        "CREATE INDEX ix_predictions_model_version_created_at ON predictions (model_version, created_at DESC) INCLUDE (id)"
+    ))
+    conn.execute(text("CREATE INDEX ix_predictions_request_id ON predictions (request_id)"))
+
+    # one partition per month of existing data + the upcoming ones, default catches the rest
+    first = conn.execute(text("SELECT min(created_at) FROM predictions_legacy")).scalar()
+    if first is not None:
+        month = month_start(first.date())
+        now = month_start(datetime.now(timezone.utc).date())
+        while month < now:
+            create_partition(conn, month)
+            month = add_months(month, 1)
+    ensure_partitions(conn)
+    conn.execute(text("CREATE TABLE predictions_default PARTITION OF predictions DEFAULT"))
+
+    conn.execute(text("""
+        INSERT INTO predictions (id, created_at, model_version, request_id, features, prediction)
+        SELECT id, created_at, model_version, request_id, features, prediction FROM predictions_legacy
+    """))
+    conn.execute(text("DROP TABLE predictions_legacy"))
+
+
+def _0004_prediction_rollups(conn: Connection) -> None:
+    # daily aggregates that outlive dropped partitions (see src.db.partitions.apply_retention)
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS prediction_rollups (
+            day DATE NOT NULL,
+            model_version VARCHAR NOT NULL,
+            prediction INTEGER NOT NULL,
+            n BIGINT NOT NULL,
+            PRIMARY KEY (day, model_version, prediction)
+        )
+    """))
+
+
+def _0005_shadow_predictions(conn: Connection) -> None:
+    # candidate-model scores logged by shadow scoring (src.ml.routing)
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS shadow_predictions (
+            id BIGSERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            request_id VARCHAR NOT NULL,
+            model_version VARCHAR NOT NULL,
+            serving_version VARCHAR NOT NULL,
+            prediction INTEGER NOT NULL,
+            probability DOUBLE PRECISION NOT NULL
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_shadow_predictions_request_id ON shadow_predictions (request_id)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_shadow_predictions_model_version_created_at "
+        "ON shadow_predictions (model_version, created_at)"
+    ))
+
+
+def _0006_churn_labels(conn: Connection) -> None:
+    # churn outcomes of served requests, see src.routers.labels
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS churn_labels (
+            id BIGSERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            request_id VARCHAR NOT NULL UNIQUE,
+            churn INTEGER NOT NULL
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_churn_labels_created_at ON churn_labels (created_at)"))
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_baseline", _0001_baseline),
+    ("0002_request_id", _0002_request_id),
+    ("0003_partition_predictions", _0003_partition_predictions),
+    ("0004_prediction_rollups", _0004_prediction_rollups),
+    ("0005_shadow_predictions", _0005_shadow_predictions),
+    ("0006_churn_labels", _0006_churn_labels),
+]
+
+
+def migrate(engine: Engine) -> List[str]:
+    """
+    Applies pending migrations, returns the ids applied.
+    """
+    applied_now = []
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_KEY})
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "id VARCHAR PRIMARY KEY, applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now())"
+        ))
+
+    for migration_id, fn in MIGRATIONS:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_KEY})
+            done = conn.execute(
+                text("SELECT 1 FROM schema_migrations WHERE id = :id"), {"id": migration_id}
+            ).first()
+            if done:
+                continue
+            fn(conn)
+            conn.execute(text("INSERT INTO schema_migrations (id) VALUES (:id)"), {"id": migration_id})
+            applied_now.append(migration_id)
+
+    return applied_now
@@ -1,10 +1,15 @@
 from typing import Optional
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column
+from sqlalchemy import JSON, Column
 from sqlalchemy.dialects.postgresql import JSONB
 
+# JSONB on Postgres, plain JSON elsewhere (SQLite for local runs / benchmarks)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 class Prediction(SQLModel, table=True):
+    # On Postgres the table is range-partitioned on created_at with
+    # PRIMARY KEY (id, created_at), see src.db.migrations
     __tablename__ = "predictions"
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -12,14 +17,14 @@ class Prediction(SQLModel, table=True):
 
     model_version: str = Field(default="v0", index=True)
 
+    # client-side id (uuid4), known before the row is written
+    request_id: Optional[str] = Field(default=None, index=True)
+
     # request payloadı JSON olarak saklayacağız
-    features: dict = Field(sa_column=Column(JSONB), default_factory=dict)
+    features: dict = Field(sa_column=Column(JSONVariant), default_factory=dict)
 
     prediction: int = Field(nullable=False)
 
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column
-
 class DriftRun(SQLModel, table=True):
     __tablename__ = "drift_runs"
 
@@ -29,6 +34,34 @@ class DriftRun(SQLModel, table=True):
     model_version: str = Field(default="unknown", index=True)
     n_current: int = Field(default=0)
 
-    summary: dict = Field(sa_column=Column(JSONB), default_factory=dict)   # overall
-    details: dict = Field(sa_column=Column(JSONB), default_factory=dict)   # per-feature
+    summary: dict = Field(sa_column=Column(JSONVariant), default_factory=dict)   # overall
+    details: dict = Field(sa_column=Column(JSONVariant), default_factory=dict)   # per-feature
+
+
+
+class ShadowPrediction(SQLModel, table=True):
+    # candidate-model scores of served requests, joined to predictions on request_id
+    __tablename__ = "shadow_predictions"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
+
+    request_id: str = Field(index=True)
+    model_version: str = Field(index=True)      # shadow (candidate) version
+    serving_version: str = Field(nullable=False)  # version that answered the request
+
+    prediction: int = Field(nullable=False)
+    probability: float = Field(nullable=False)
+
+
+class ChurnLabel(SQLModel, table=True):
+    # observed outcome of a served request, joined to predictions on request_id
+    # by the trainer's incremental mode
+    __tablename__ = "churn_labels"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # arrival (or last correction) time; the trainer only reads labels past its last watermark
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False, index=True)
 
+    request_id: str = Field(unique=True)
+    churn: int = Field(nullable=False)
@@ -0,0 +1,152 @@
+"""
+Monthly range partitions of the predictions table.
+
+    python -m src.db.partitions                         # create upcoming partitions
+    python -m src.db.partitions --retention-months 6    # + roll up and drop older ones
+    python -m src.db.partitions --retention-months 6 --mode detach
+"""
+import argparse
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITIONS_AHEAD = int(os.getenv("PREDICTION_PARTITIONS_AHEAD", "2"))
+
+_NAME = re.compile(r"^predictions_p(\d{4})(\d{2})$")
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"predictions_p{month:%Y%m}"
+
+
+def create_partition(conn: Connection, month: date) -> None:
+    """
+    Creates the partition holding [month, next month) if it doesn't exist.
+
+    Rows of that month already in the default partition are moved into it
+    (Postgres refuses to create the partition while they are there).
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    lo, hi = month.isoformat(), add_months(month, 1).isoformat()
+
+    exists = conn.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar()
+    if exists is not None:
+        return
+
+    has_default = conn.execute(text("SELECT to_regclass('predictions_default')")).scalar() is not None
+    stranded = has_default and conn.execute(
+        text("SELECT 1 FROM predictions_default WHERE created_at >= :lo AND created_at < :hi LIMIT 1"),
+        {"lo": lo, "hi": hi},
+    ).first() is not None
+
+    if stranded:
+        conn.execute(text("ALTER TABLE predictions DETACH PARTITION predictions_default"))
+
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF predictions FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+
+    if stranded:
+        conn.execute(text(
+            "WITH moved AS (DELETE FROM predictions_default WHERE created_at >= :lo AND created_at < :hi RETURNING *) "
+            "INSERT INTO predictions SELECT * FROM moved"
+        ), {"lo": lo, "hi": hi})
+        conn.execute(text("ALTER TABLE predictions ATTACH PARTITION predictions_default DEFAULT"))
+
+
+def ensure_partitions(conn: Connection, ahead: int = PARTITIONS_AHEAD, today: date | None = None) -> None:
+    """
+    Makes sure the current month and the next `ahead` months have a partition,
+    so inserts never land in the default partition.
+    """
+    month = month_start(today or datetime.now(timezone.utc).date())
+    for i in range(ahead + 1):
+        create_partition(conn, add_months(month, i))
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """
+    Monthly partitions of predictions as (name, month), oldest first.
+    """
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'predictions'"
+    )).all()
+
+    out = []
+    for (name,) in rows:
+        m = _NAME.match(name)
+        if m:
+            out.append((name, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(out, key=lambda x: x[1])
+
+
+def apply_retention(conn: Connection, retention_months: int, mode: str = "drop", today: date | None = None) -> List[str]:
+    """
+    Rolls up and removes monthly partitions older than retention_months.
+
+    Every partition is first aggregated into prediction_rollups
+    (day x model_version x prediction counts), then
+      mode="drop":   dropped
+      mode="detach": detached and kept as a standalone table for archiving (pg_dump / cold storage)
+
+    Returns the partitions handled.
+    """
+    if mode not in ("drop", "detach"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -retention_months)
+    handled = []
+
+    for name, month in list_partitions(conn):
+        if month >= cutoff:
+            continue
+
+        conn.execute(text(
+            "INSERT INTO prediction_rollups (day, model_version, prediction, n) "
+            f"SELECT date_trunc('day', created_at)::date, model_version, prediction, count(*) FROM {name} "
+            "GROUP BY 1, 2, 3 "
+            "ON CONFLICT (day, model_version, prediction) DO UPDATE SET n = prediction_rollups.n + EXCLUDED.n"
+        ))
+        conn.execute(text(f"ALTER TABLE predictions DETACH PARTITION {name}"))
+        if mode == "drop":
+            conn.execute(text(f"DROP TABLE {name}"))
+        else:
+            conn.execute(text(f"ALTER TABLE {name} RENAME TO {name.replace('predictions_', 'predictions_archive_')}"))
+        handled.append(name)
+
+    return handled
+
+
+def main():
+    from src.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Maintain predictions partitions")
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD, help="months to pre-create")
+    parser.add_argument("--retention-months", type=int, help="roll up and remove partitions older than this")
+    parser.add_argument("--mode", choices=["drop", "detach"], default="drop")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        ensure_partitions(conn, ahead=args.ahead)
+        if args.retention_months is not None:
+            for name in apply_retention(conn, args.retention_months, mode=args.mode):
+                print(f"{args.mode}: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import os
 from sqlmodel import SQLModel, create_engine, Session
 
+from src.db.migrations import migrate
+from src.db.partitions import ensure_partitions
+
 def get_database_url() -> str:
+    # full URL override, e.g. sqlite:///./churn.db for local runs and benchmarks
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+
     user = os.getenv("POSTGRES_USER")
     password = os.getenv("POSTGRES_PASSWORD")
     host = os.getenv("POSTGRES_HOST", "postgres")
@@ -10,11 +18,25 @@ def get_database_url() -> str:
 
     return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
 
-engine = create_engine(get_database_url(), pool_pre_ping=True)
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        # request handlers, the log writer and shadow scoring share connections across threads
+        return {"connect_args": {"check_same_thread": False}}
+    return {"pool_pre_ping": True}
+
+
+engine = create_engine(get_database_url(), **_engine_kwargs(get_database_url()))
 
 def get_session():
     with Session(engine) as session:
         yield session
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    # Postgres schema is owned by src.db.migrations (partitioned predictions table)
+    if engine.dialect.name != "postgresql":
+        SQLModel.metadata.create_all(engine)
+        return
+
+    migrate(engine)
+    with engine.begin() as conn:
+        ensure_partitions(conn)
@@ -0,0 +1,192 @@
+import os
+import time
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session
+
+from src.db.crud import insert_predictions
+
+# sync: insert inside the request (default) | async: write-behind via PredictionWriter
+PREDICTION_LOG_MODE = os.getenv("PREDICTION_LOG_MODE", "sync")
+PREDICTION_LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", "10000"))
+PREDICTION_LOG_BATCH_SIZE = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", "500"))
+PREDICTION_LOG_FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", "0.5"))
+# block: request waits for queue space | drop: row is discarded and counted
+PREDICTION_LOG_POLICY = os.getenv("PREDICTION_LOG_POLICY", "block")
+
+
+class PredictionWriter:
+    """
+    Write-behind logger for Prediction rows.
+
+    Requests put row dicts on a bounded queue; one background thread drains it
+    and writes multi-row INSERTs when batch_size rows are waiting or
+    flush_interval seconds have passed, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        queue_size: int = PREDICTION_LOG_QUEUE_SIZE,
+        batch_size: int = PREDICTION_LOG_BATCH_SIZE,
+        flush_interval: float = PREDICTION_LOG_FLUSH_INTERVAL,
+        policy: str = PREDICTION_LOG_POLICY,
+    ):
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Unknown PREDICTION_LOG_POLICY: {policy}")
+
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+        self.last_flush_ms = 0.0
+
+    # ----------------------
+    # request side
+    # ----------------------
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queues one row. Returns False if it was dropped (policy="drop", queue full).
+        """
+        if self.policy == "drop":
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                with self._stats_lock:
+                    self.dropped += 1
+                return False
+        else:
+            start = time.perf_counter()
+            self._queue.put(row)
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.blocked_seconds += waited
+
+        with self._stats_lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    # ----------------------
+    # worker side
+    # ----------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Flushes everything queued so far and stops the worker.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)  # sentinel, always behind the last real row
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            stop = False
+
+            # wait for the first row, then fill up until size or time trigger
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            with Session(self.engine) as session:
+                insert_predictions(session, batch)
+        except Exception:
+            # the request already returned; count the loss instead of retrying forever
+            with self._stats_lock:
+                self.failed += len(batch)
+            return
+        with self._stats_lock:
+            self.written += len(batch)
+            self.flushes += 1
+            self.last_flush_ms = (time.perf_counter() - start) * 1000.0
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "policy": self.policy,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "blocked_seconds": self.blocked_seconds,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+prediction_writer: Optional[PredictionWriter] = None
+
+
+def get_prediction_writer() -> Optional[PredictionWriter]:
+    """
+    The running writer when PREDICTION_LOG_MODE=async, else None.
+    """
+    return prediction_writer
+
+
+def start_prediction_writer(engine: Any) -> Optional[PredictionWriter]:
+    global prediction_writer
+    if PREDICTION_LOG_MODE != "async":
+        return None
+    if prediction_writer is None:
+        prediction_writer = PredictionWriter(engine)
+    prediction_writer.start()
+    return prediction_writer
+
+
+def stop_prediction_writer() -> None:
+    if prediction_writer is not None:
+        prediction_writer.stop()
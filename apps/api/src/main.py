@@ -1,18 +1,65 @@
 from fastapi import FastAPI
+from src.core.metrics import metrics_middleware, metrics_response, record_reload, register_stats, set_model_version
 from src.routers.health import router as health_router
 from src.routers.predict import router as predict_router
-from src.db.session import init_db
+from src.db.session import init_db, engine
+from src.db.writer import get_prediction_writer, start_prediction_writer, stop_prediction_writer
+from src.db.async_session import dispose_async_engine
+from src.ml.loader import model_registry
+from src.ml.routing import traffic_router
+from src.ml.scoring_pool import scoring_pool
+from src.ml.batcher import micro_batcher
+from src.ml.artifact_cache import artifact_cache
+from src.ml.result_cache import prediction_cache
+from src.ml.routing import shadow_scorer
+from src.ml.watcher import pointer_watcher
 from src.routers.drift import router as drift_router
+from src.routers.labels import router as labels_router
 from src.routers.model import router as model_router
 
 
 app = FastAPI(title="Customer Churn MLOps API", version="0.1.0")
+app.middleware("http")(metrics_middleware)
+
+model_registry.add_listener(lambda bundle: set_model_version(bundle.model_version))
+model_registry.add_reload_listener(record_reload)
+
+# existing stats() dicts, read at scrape time
+register_stats("model_registry", model_registry.stats)
+register_stats("prediction_log", lambda: w.stats() if (w := get_prediction_writer()) is not None else None)
+register_stats("batcher", micro_batcher.stats)
+register_stats("scoring_pool", scoring_pool.stats)
+register_stats("shadow", shadow_scorer.stats)
+register_stats("watcher", pointer_watcher.stats)
+register_stats("result_cache", lambda: prediction_cache.stats() if prediction_cache is not None else None)
+register_stats("artifact_cache", lambda: artifact_cache.stats() if artifact_cache is not None else None)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    start_prediction_writer(engine)
+    # first poll loads the active model in the background, later ones pick up new versions
+    pointer_watcher.start()
+    # split / shadow candidates from MODEL_TRAFFIC_SPLIT, MODEL_SHADOW_VERSIONS
+    traffic_router.preload(model_registry)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    pointer_watcher.stop()
+    # flush buffered prediction logs before the process exits
+    stop_prediction_writer()
+    micro_batcher.stop()
+    scoring_pool.shutdown()
+    await dispose_async_engine()
 
 app.include_router(health_router)
 app.include_router(predict_router)
 app.include_router(drift_router)
 app.include_router(model_router)
+app.include_router(labels_router)
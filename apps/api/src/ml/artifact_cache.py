@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Optional, Tuple
+
+# content-addressed artifact cache shared by all workers on the node ("" disables it)
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", "/tmp/churn-artifacts")
+# re-hash cached files when they are used, not only when they are written
+ARTIFACT_CACHE_VERIFY = os.getenv("ARTIFACT_CACHE_VERIFY", "1") == "1"
+
+_CHUNK = 1024 * 1024
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Artifacts on local disk, stored by sha256 under {root}/sha256/ab/abcdef...
+
+    Entries are written to a temp file, checked against the expected digest
+    and renamed into place, so concurrent workers never see a partial file and
+    a corrupt download never enters the cache. Because a path is immutable
+    for its digest, model files can be memory-mapped by every worker and
+    shared through the page cache.
+    """
+
+    def __init__(self, root: str, verify: bool = ARTIFACT_CACHE_VERIFY):
+        self.root = root
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        self.corrupt = 0
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, "sha256", digest[:2], digest)
+
+    def get(self, digest: str, size: Optional[int] = None) -> Optional[str]:
+        """
+        Path of the verified entry for digest, or None. Bad entries are removed.
+        """
+        path = self.path(digest)
+        if not os.path.exists(path):
+            return None
+        if (size is not None and os.path.getsize(path) != size) or (self.verify and sha256_file(path) != digest):
+            self.corrupt += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return path
+
+    def fetch(self, digest: str, size: Optional[int], download: Callable[[str], None]) -> Tuple[str, bool]:
+        """
+        Returns (path, hit). On a miss download(tmp_path) writes the object,
+        which is checked against digest before it is moved into the cache.
+        Raises ValueError if the download doesn't match.
+        """
+        path = self.get(digest, size)
+        if path is not None:
+            with self._lock:
+                self.hits += 1
+            return path, True
+
+        with self._lock:
+            self.misses += 1
+        target = self.path(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        os.close(fd)
+        try:
+            download(tmp)
+            actual = sha256_file(tmp)
+            if actual != digest:
+                raise ValueError(f"checksum mismatch: expected sha256 {digest}, got {actual}")
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return target, False
+
+    def stats(self) -> dict:
+        return {
+            "dir": self.root,
+            "hits": self.hits,
+            "misses": self.misses,
+            "corrupt": self.corrupt,
+        }
+
+
+artifact_cache: Optional[ArtifactCache] = ArtifactCache(ARTIFACT_CACHE_DIR) if ARTIFACT_CACHE_DIR else None
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+from typing import BinaryIO, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# s3 (MinIO or any S3 API) | local (directory, e.g. a volume shared by the nodes)
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "s3")
+# root of the local store; keys map to {root}/{prefix}/{version}/{name}
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH", "/artifacts")
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://minio:9000")
+MINIO_BUCKET = os.getenv("MINIO_BUCKET", "mlops-artifacts")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ROOT_USER")
+MINIO_SECRET_KEY = os.getenv("MINIO_ROOT_PASSWORD")
+
+# one pooled client per process: connection pool size, retries, timeouts
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "5"))
+S3_RETRY_MODE = os.getenv("S3_RETRY_MODE", "standard")
+S3_CONNECT_TIMEOUT = float(os.getenv("S3_CONNECT_TIMEOUT", "5"))
+S3_READ_TIMEOUT = float(os.getenv("S3_READ_TIMEOUT", "60"))
+
+# objects above the threshold (model.joblib) are downloaded as parallel ranged GETs
+ARTIFACT_FETCH_WORKERS = int(os.getenv("ARTIFACT_FETCH_WORKERS", "4"))
+MULTIPART_THRESHOLD_MB = int(os.getenv("MULTIPART_THRESHOLD_MB", "16"))
+MULTIPART_CHUNK_MB = int(os.getenv("MULTIPART_CHUNK_MB", "8"))
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD_MB * 1024 * 1024,
+    multipart_chunksize=MULTIPART_CHUNK_MB * 1024 * 1024,
+    max_concurrency=ARTIFACT_FETCH_WORKERS,
+)
+
+_CHUNK = 1024 * 1024
+
+
+class ArtifactNotFound(KeyError):
+    """
+    The key does not exist in the artifact store (unknown version, optional
+    artifact not published). Other store errors propagate unchanged.
+    """
+
+
+class ArtifactStore:
+    """
+    Where model versions live: {prefix}/{version}/{name} plus the
+    {prefix}/latest.json pointer.
+
+    read / download / write work on whole objects, open streams one,
+    read_if_changed is the conditional read the pointer watcher polls with.
+    local_path is the object's path on this node, for stores that have one
+    (the loader then memory-maps it in place instead of copying it).
+    """
+
+    name = "abstract"
+    local_files = False
+
+    def read(self, key: str) -> bytes:
+        with self.open(key) as f:
+            return f.read()
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def read_large(self, key: str) -> bytes:
+        """
+        read() for big objects (model.joblib); stores may parallelize it.
+        """
+        return self.read(key)
+
+    def download(self, key: str, path: str) -> None:
+        with self.open(key) as src, open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+
+    def read_if_changed(self, key: str, etag: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        (content, etag), or (None, etag) when the object still has etag.
+        """
+        raise NotImplementedError
+
+    def write(self, key: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def uri(self, key: str) -> str:
+        raise NotImplementedError
+
+
+# ======================
+# MinIO / S3
+# ======================
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    MinIO-compatible bucket through one process-wide boto3 client
+    (thread-safe, keeps a connection pool).
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str = MINIO_BUCKET, endpoint: str = MINIO_ENDPOINT):
+        self.bucket = bucket
+        self.endpoint = endpoint
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint,
+                        aws_access_key_id=MINIO_ACCESS_KEY,
+                        aws_secret_access_key=MINIO_SECRET_KEY,
+                        region_name="us-east-1",
+                        config=Config(
+                            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                            retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": S3_RETRY_MODE},
+                            connect_timeout=S3_CONNECT_TIMEOUT,
+                            read_timeout=S3_READ_TIMEOUT,
+                        ),
+                    )
+        return self._client
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ArtifactNotFound(key) from e
+            raise
+
+    def read_large(self, key: str) -> bytes:
+        buf = BytesIO()
+        try:
+            self.client.download_fileobj(self.bucket, key, buf, Config=TRANSFER_CONFIG)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ArtifactNotFound(key) from e
+            raise
+        return buf.getvalue()
+
+    def download(self, key: str, path: str) -> None:
+        try:
+            self.client.download_file(self.bucket, key, path, Config=TRANSFER_CONFIG)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ArtifactNotFound(key) from e
+            raise
+
+    def read_if_changed(self, key: str, etag: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+        kwargs = {"Bucket": self.bucket, "Key": key}
+        if etag:
+            kwargs["IfNoneMatch"] = etag
+        try:
+            obj = self.client.get_object(**kwargs)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+                return None, etag
+            if _is_not_found(e):
+                raise ArtifactNotFound(key) from e
+            raise
+        return obj["Body"].read(), obj.get("ETag")
+
+    def write(self, key: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        self.client.upload_fileobj(
+            BytesIO(content), self.bucket, key, ExtraArgs={"ContentType": content_type}, Config=TRANSFER_CONFIG
+        )
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+
+# ======================
+# Local filesystem
+# ======================
+
+class LocalArtifactStore(ArtifactStore):
+    """
+    Artifacts as plain files under root, same key layout as the bucket.
+
+    Writes go to a temp file in the target directory and are renamed into
+    place (os.replace), so a reader sees the old or the new object, never a
+    partial one; that makes repointing latest.json atomic. The etag is
+    (inode, mtime_ns, size), which changes with every replace.
+    """
+
+    name = "local"
+    local_files = True
+
+    def __init__(self, root: str = ARTIFACT_STORE_PATH):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        parts = [p for p in key.split("/") if p]
+        if not parts or any(p in (".", "..") for p in parts):
+            raise ValueError(f"invalid artifact key: {key!r}")
+        return os.path.join(self.root, *parts)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self.path(key), "rb")
+        except FileNotFoundError as e:
+            raise ArtifactNotFound(key) from e
+
+    @staticmethod
+    def _etag(st: os.stat_result) -> str:
+        return f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    def read_if_changed(self, key: str, etag: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+        # fstat of the opened file: content and etag belong to the same object even if it is replaced meanwhile
+        with self.open(key) as f:
+            current = self._etag(os.fstat(f.fileno()))
+            if etag is not None and current == etag:
+                return None, etag
+            return f.read(), current
+
+    def write(self, key: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise ArtifactNotFound(key)
+        return path
+
+    def uri(self, key: str) -> str:
+        return f"file://{self.path(key)}"
+
+
+def get_artifact_store(kind: str = ARTIFACT_STORE) -> ArtifactStore:
+    if kind == "s3":
+        return S3ArtifactStore()
+    if kind == "local":
+        return LocalArtifactStore()
+    raise ValueError(f"ARTIFACT_STORE must be s3 or local, got {kind!r}")
+
+
+artifact_store = get_artifact_store()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.ml.loader import ArtifactBundle
+from src.ml.predict import to_dataframe
+
+# off: score each request on its own | auto: batch only versions without a compiled
+# scorer (that one is already ~microseconds per row) | on: batch every request
+PREDICT_BATCHING = os.getenv("PREDICT_BATCHING", "off")
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2"))
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "64"))
+
+# recent batches kept for the wait / size percentiles in stats()
+_RECENT = 2048
+
+
+class MicroBatcher:
+    """
+    Dynamic batching of concurrent single-row predictions.
+
+    Requests put (bundle, features) on a queue and wait on a Future. One
+    background thread takes the first waiting request, keeps collecting
+    until window_ms has passed since it arrived or max_rows are waiting,
+    then scores each model version in the batch with one predict_proba on
+    a to_dataframe() frame and resolves the Futures.
+    """
+
+    def __init__(self, mode: str = PREDICT_BATCHING, window_ms: float = PREDICT_BATCH_WINDOW_MS, max_rows: int = PREDICT_BATCH_MAX_ROWS):
+        if mode not in ("off", "auto", "on"):
+            raise ValueError(f"Unknown PREDICT_BATCHING: {mode}")
+        self.mode = mode
+        self.window = window_ms / 1000.0
+        self.max_rows = max(1, max_rows)
+
+        self._queue: "queue.Queue[Optional[Tuple[ArtifactBundle, Dict[str, Any], Future, float]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.rows = 0
+        self.failed = 0
+        self.size_counts: Dict[int, int] = {}
+        self._recent_sizes: Deque[int] = deque(maxlen=_RECENT)
+        self._recent_waits: Deque[float] = deque(maxlen=_RECENT)
+        self._recent_score: Deque[float] = deque(maxlen=_RECENT)
+
+    def applies(self, bundle: ArtifactBundle) -> bool:
+        return self.mode == "on" or (self.mode == "auto" and bundle.scorer is None)
+
+    # ----------------------
+    # request side
+    # ----------------------
+
+    def submit(self, bundle: ArtifactBundle, features: Dict[str, Any]) -> Future:
+        """
+        Queues one sanitized feature dict; the Future resolves to its churn probability.
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((bundle, features, future, time.perf_counter()))
+        return future
+
+    def predict_proba_one(self, bundle: ArtifactBundle, features: Dict[str, Any]) -> float:
+        return self.submit(bundle, features).result()
+
+    # ----------------------
+    # batching thread
+    # ----------------------
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _collect(self, first) -> Tuple[list, bool]:
+        batch = [first]
+        deadline = first[3] + self.window
+        while len(batch) < self.max_rows:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._score(batch)
+            if stopping:
+                return
+
+    def _score(self, batch: list) -> None:
+        started = time.perf_counter()
+        by_version: Dict[str, List[tuple]] = {}
+        for item in batch:
+            by_version.setdefault(item[0].model_version, []).append(item)
+
+        for items in by_version.values():
+            bundle = items[0][0]
+            try:
+                proba = bundle.pipeline.predict_proba(to_dataframe([it[1] for it in items]))[:, 1]
+            except Exception as e:
+                self.failed += len(items)
+                for it in items:
+                    it[2].set_exception(e)
+                continue
+            for it, p in zip(items, proba):
+                it[2].set_result(float(p))
+
+        finished = time.perf_counter()
+        n = len(batch)
+        self.batches += 1
+        self.rows += n
+        self.size_counts[n] = self.size_counts.get(n, 0) + 1
+        self._recent_sizes.append(n)
+        self._recent_score.append(finished - started)
+        self._recent_waits.extend(started - it[3] for it in batch)
+
+    def stats(self) -> dict:
+        waits = np.array(self._recent_waits) * 1000
+        score = np.array(self._recent_score) * 1000
+        sizes = np.array(self._recent_sizes)
+        return {
+            "mode": self.mode,
+            "window_ms": self.window * 1000,
+            "max_rows": self.max_rows,
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed": self.failed,
+            "mean_batch_size": (self.rows / self.batches) if self.batches else 0.0,
+            "p50_batch_size": float(np.percentile(sizes, 50)) if len(sizes) else 0.0,
+            "max_batch_size": int(sizes.max()) if len(sizes) else 0,
+            "batch_size_counts": dict(sorted(self.size_counts.items())),
+            "p50_queue_wait_ms": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+            "p99_queue_wait_ms": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+            "p50_score_ms": float(np.percentile(score, 50)) if len(score) else 0.0,
+        }
+
+
+micro_batcher = MicroBatcher()
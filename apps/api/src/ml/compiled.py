@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+@dataclass(frozen=True)
+class CompiledLinearModel:
+    """
+    NumPy form of the train.py pipeline:
+    StandardScaler on num_cols + OneHotEncoder on cat_cols -> binary LogisticRegression
+    (or log-loss SGDClassifier, the streaming trainer's model: same sigmoid of a linear score).
+
+    One-hot columns are never materialized: each category maps straight to its
+    coefficient, unknown categories contribute 0 (handle_unknown="ignore").
+    """
+    num_cols: List[str]
+    num_mean: np.ndarray
+    num_scale: np.ndarray
+    num_coef: np.ndarray
+    cat_cols: List[str]
+    cat_coef: List[Dict[Any, float]]
+    intercept: float
+
+    def decision_one(self, features: Dict[str, Any]) -> float:
+        x = np.fromiter((features[c] for c in self.num_cols), dtype=float, count=len(self.num_cols))
+        z = self.intercept + float(((x - self.num_mean) / self.num_scale) @ self.num_coef)
+        for c, lookup in zip(self.cat_cols, self.cat_coef):
+            z += lookup.get(features[c], 0.0)
+        return z
+
+    def predict_proba_one(self, features: Dict[str, Any]) -> float:
+        """
+        Churn probability for one sanitized feature dict, no pandas involved.
+        """
+        return float(expit(self.decision_one(features)))
+
+
+def _only_step(est: Any, kind: type) -> Optional[Any]:
+    # train.py wraps each transformer in a one-step Pipeline
+    if isinstance(est, Pipeline):
+        if len(est.steps) != 1:
+            return None
+        est = est.steps[0][1]
+    return est if type(est) is kind else None
+
+
+def _is_logistic(model: Any) -> bool:
+    if type(model) is LogisticRegression:
+        return True
+    return type(model) is SGDClassifier and model.loss == "log_loss"
+
+
+def compile_pipeline(pipe: Any) -> Optional[CompiledLinearModel]:
+    """
+    Compiles a fitted pipeline into a CompiledLinearModel.
+
+    Returns None for anything that is not exactly the shape train.py produces,
+    the caller then keeps using pipe.predict_proba.
+    """
+    if not isinstance(pipe, Pipeline) or len(pipe.steps) != 2:
+        return None
+    pre, model = pipe.steps[0][1], pipe.steps[1][1]
+
+    if not isinstance(pre, ColumnTransformer) or not _is_logistic(model):
+        return None
+    if len(model.classes_) != 2 or getattr(model, "multi_class", "auto") == "multinomial":
+        return None
+
+    coef = model.coef_.ravel()
+    offset = 0
+    num_cols: List[str] = []
+    means, scales, num_coef = [], [], []
+    cat_cols: List[str] = []
+    cat_coef: List[Dict[Any, float]] = []
+
+    for name, trans, cols in pre.transformers_:
+        if trans == "drop" or len(cols) == 0:
+            continue
+        cols = list(cols)
+        if not all(isinstance(c, str) for c in cols):
+            return None
+
+        scaler = _only_step(trans, StandardScaler)
+        encoder = _only_step(trans, OneHotEncoder)
+
+        if scaler is not None:
+            width = len(cols)
+            means.append(scaler.mean_ if scaler.with_mean else np.zeros(width))
+            scales.append(scaler.scale_ if scaler.with_std else np.ones(width))
+            num_cols.extend(cols)
+            num_coef.append(coef[offset:offset + width])
+            offset += width
+        elif encoder is not None:
+            if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+                return None
+            if encoder.handle_unknown != "ignore":
+                return None
+            for c, cats in zip(cols, encoder.categories_):
+                cat_cols.append(c)
+                cat_coef.append({cat: float(w) for cat, w in zip(cats, coef[offset:offset + len(cats)])})
+                offset += len(cats)
+        else:
+            return None
+
+    if offset != coef.shape[0]:
+        return None
+
+    return CompiledLinearModel(
+        num_cols=num_cols,
+        num_mean=np.concatenate(means) if means else np.zeros(0),
+        num_scale=np.concatenate(scales) if scales else np.ones(0),
+        num_coef=np.concatenate(num_coef) if num_coef else np.zeros(0),
+        cat_cols=cat_cols,
+        cat_coef=cat_coef,
+        intercept=float(model.intercept_[0]),
+    )
+
+
+def parity_error(compiled: CompiledLinearModel, pipe: Any, frame: pd.DataFrame) -> float:
+    """
+    Max absolute difference between the compiled single-row path and
+    pipe.predict_proba over every row of frame.
+    """
+    if frame.empty:
+        return 0.0
+    expected = pipe.predict_proba(frame)[:, 1]
+    got = np.array([compiled.predict_proba_one(r) for r in frame.to_dict(orient="records")])
+    return float(np.max(np.abs(expected - got)))
@@ -1,29 +1,34 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
 
-def psi(expected: pd.Series, actual: pd.Series, bins: int = 10) -> float:
+def _finite(values: pd.Series) -> pd.Series:
+    return values.astype(float).replace([np.inf, -np.inf], np.nan).dropna()
+
+
+def numeric_edges(expected: pd.Series, bins: int = 10) -> Optional[np.ndarray]:
     """
-    Population Stability Index for numeric columns.
+    PSI bin edges from reference quantiles.
+    None if the reference column is too small or too constant to bin.
     """
-    expected = expected.astype(float).replace([np.inf, -np.inf], np.nan).dropna()
-    actual = actual.astype(float).replace([np.inf, -np.inf], np.nan).dropna()
-
-    if len(expected) < 10 or len(actual) < 10:
-        return 0.0
+    expected = _finite(expected)
+    if len(expected) < 10:
+        return None
 
-    # same bin edges based on expected quantiles
     quantiles = np.linspace(0, 1, bins + 1)
     edges = np.unique(np.quantile(expected, quantiles))
     if len(edges) < 3:  # not enough variability
-        return 0.0
+        return None
+    return edges
 
-    exp_counts, _ = np.histogram(expected, bins=edges)
-    act_counts, _ = np.histogram(actual, bins=edges)
 
+def psi_from_counts(exp_counts: np.ndarray, act_counts: np.ndarray) -> float:
+    """
+    PSI between two histograms over the same bins.
+    """
     exp_perc = exp_counts / max(exp_counts.sum(), 1)
     act_perc = act_counts / max(act_counts.sum(), 1)
 
@@ -35,16 +40,31 @@ def psi(expected: pd.Series, actual: pd.Series, bins: int = 10) -> float:
     return float(np.sum((act_perc - exp_perc) * np.log(act_perc / exp_perc)))
 
 
-def cat_l1(expected: pd.Series, actual: pd.Series, top_k: int = 50) -> float:
+def psi(expected: pd.Series, actual: pd.Series, bins: int = 10) -> float:
     """
-    L1 distance between category distributions (0..2).
+    Population Stability Index for numeric columns.
     """
-    expected = expected.fillna("").astype(str)
-    actual = actual.fillna("").astype(str)
+    expected = _finite(expected)
+    actual = _finite(actual)
 
-    exp = expected.value_counts(normalize=True)
-    act = actual.value_counts(normalize=True)
+    if len(expected) < 10 or len(actual) < 10:
+        return 0.0
+
+    # same bin edges based on expected quantiles
+    edges = numeric_edges(expected, bins)
+    if edges is None:
+        return 0.0
 
+    exp_counts, _ = np.histogram(expected, bins=edges)
+    act_counts, _ = np.histogram(actual, bins=edges)
+
+    return psi_from_counts(exp_counts, act_counts)
+
+
+def l1_from_freqs(exp: pd.Series, act: pd.Series, top_k: int = 50) -> float:
+    """
+    L1 distance between two category -> frequency series sorted by frequency.
+    """
     # union of top categories
     cats = set(exp.head(top_k).index).union(set(act.head(top_k).index))
     if not cats:
@@ -56,26 +76,40 @@ def cat_l1(expected: pd.Series, actual: pd.Series, top_k: int = 50) -> float:
     return float(dist)
 
 
-def compute_drift(
-    reference: pd.DataFrame,
-    current: pd.DataFrame,
-    num_cols: List[str],
-    cat_cols: List[str],
+def cat_l1(expected: pd.Series, actual: pd.Series, top_k: int = 50) -> float:
+    """
+    L1 distance between category distributions (0..2).
+    """
+    expected = expected.fillna("").astype(str)
+    actual = actual.fillna("").astype(str)
+
+    exp = expected.value_counts(normalize=True)
+    act = actual.value_counts(normalize=True)
+
+    return l1_from_freqs(exp, act, top_k=top_k)
+
+
+def summarize_drift(
+    num_scores: Dict[str, float],
+    cat_scores: Dict[str, float],
+    n_reference: int,
+    n_current: int,
     psi_threshold: float = 0.2,
     cat_threshold: float = 0.2,
 ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Builds the (summary, details) drift report from per-feature scores.
+    """
     details: Dict[str, Any] = {"numeric": {}, "categorical": {}}
 
     drifted = []
 
-    for c in num_cols:
-        score = psi(reference[c], current[c])
+    for c, score in num_scores.items():
         details["numeric"][c] = {"psi": score, "drift": score >= psi_threshold}
         if score >= psi_threshold:
             drifted.append(c)
 
-    for c in cat_cols:
-        score = cat_l1(reference[c], current[c])
+    for c, score in cat_scores.items():
         details["categorical"][c] = {"l1": score, "drift": score >= cat_threshold}
         if score >= cat_threshold:
             drifted.append(c)
@@ -85,7 +119,237 @@ def compute_drift(
         "drifted_features": drifted,
         "psi_threshold": psi_threshold,
         "cat_threshold": cat_threshold,
-        "n_reference": int(len(reference)),
-        "n_current": int(len(current)),
+        "n_reference": int(n_reference),
+        "n_current": int(n_current),
     }
     return summary, details
+
+
+def build_drift_profile(reference: pd.DataFrame, num_cols: List[str], cat_cols: List[str], bins: int = 10) -> Dict[str, Any]:
+    """
+    Same structure as the trainer's drift_profile.json (apps/trainer/src/build_reference.py),
+    for model versions published without one.
+    """
+    profile: Dict[str, Any] = {
+        "bins": bins,
+        "n_reference": int(len(reference)),
+        "numeric": {},
+        "categorical": {},
+    }
+
+    for c in num_cols:
+        expected = _finite(reference[c])
+        edges = numeric_edges(expected, bins)
+        if edges is None:
+            profile["numeric"][c] = {"edges": None, "expected": None}
+            continue
+        counts, _ = np.histogram(expected, bins=edges)
+        profile["numeric"][c] = {
+            "edges": edges.tolist(),
+            "expected": (counts / max(counts.sum(), 1)).tolist(),
+        }
+
+    for c in cat_cols:
+        freqs = reference[c].fillna("").astype(str).value_counts(normalize=True)
+        profile["categorical"][c] = {"freqs": {k: float(v) for k, v in freqs.items()}}
+
+    return profile
+
+
+class DriftEngine:
+    """
+    Vectorized drift scoring against a drift profile.
+
+    Numeric: each block of rows is sorted as one (features x rows) array and
+    bin counts are read off by np.searchsorted of the reference edges, then all
+    columns are scored with one PSI reduction over a (features x bins) matrix.
+    Categorical: values are factorized, the (few) distinct values are mapped to
+    codes over the reference vocabulary and counted with np.bincount.
+
+    Scores are the same as psi() / cat_l1() against the reference the profile
+    was built from (with more than top_k categories, ties at the cut-off may
+    select different categories).
+    """
+
+    # rows sorted per step, bounds the (features x rows) temporaries
+    CHUNK_ROWS = 65536
+
+    def __init__(self, profile: Dict[str, Any], num_cols: List[str], cat_cols: List[str], top_k: int = 50):
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.top_k = top_k
+        self.n_reference = int(profile["n_reference"])
+
+        # numeric: stacked edges, padded to the widest column
+        num_ref = [profile["numeric"].get(c) or {} for c in self.num_cols]
+        self.has_edges = np.array([r.get("edges") is not None for r in num_ref], dtype=bool)
+        n_bins = np.array([len(r["edges"]) - 1 if r.get("edges") is not None else 1 for r in num_ref], dtype=int)
+        width = int(n_bins.max()) if len(n_bins) else 1
+
+        self.n_bins = n_bins
+        self.edges: List[Optional[np.ndarray]] = []
+        self.expected = np.zeros((len(num_ref), width))
+        for i, r in enumerate(num_ref):
+            if r.get("edges") is None:
+                self.edges.append(None)
+                continue
+            self.edges.append(np.asarray(r["edges"], dtype=float))
+            exp = np.asarray(r["expected"], dtype=float)
+            self.expected[i, : len(exp)] = exp / max(exp.sum(), 1)
+        self.bin_mask = np.arange(width)[None, :] < n_bins[:, None]
+        self.width = width
+
+        # categorical: reference vocabulary in frequency order
+        self.vocab: List[pd.Index] = []
+        self.exp_freqs: List[np.ndarray] = []
+        for c in self.cat_cols:
+            freqs = (profile["categorical"].get(c) or {}).get("freqs", {})
+            self.vocab.append(pd.Index(list(freqs.keys()), dtype=object))
+            self.exp_freqs.append(np.asarray(list(freqs.values()), dtype=float))
+
+    # ----------------------
+    # numeric
+    # ----------------------
+
+    def numeric_counts(self, current: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (counts[features, bins], n_finite[features]) for the numeric columns.
+        """
+        f = len(self.num_cols)
+        counts = np.zeros((f, self.width), dtype=np.int64)
+        n_finite = np.zeros(f, dtype=np.int64)
+        if f == 0 or len(current) == 0:
+            return counts, n_finite
+
+        values = current[self.num_cols].to_numpy(dtype=float)
+
+        for start in range(0, len(values), self.CHUNK_ROWS):
+            # one sort of the (features x rows) block, NaN sorts last
+            block = np.sort(values[start:start + self.CHUNK_ROWS].T, axis=1)
+            n_finite += np.isfinite(block).sum(axis=1)
+
+            # position of every stacked edge in its sorted column; like np.histogram
+            # the last edge is inclusive, values outside [e0, e_k] are not counted
+            left = np.empty((f, self.width + 1), dtype=np.int64)
+            for j in np.flatnonzero(self.has_edges):
+                k = self.n_bins[j]
+                left[j, :k] = np.searchsorted(block[j], self.edges[j][:-1], side="left")
+                left[j, k:] = np.searchsorted(block[j], self.edges[j][-1], side="right")
+            cum = np.where(self.has_edges[:, None], left, 0)
+            counts += np.diff(cum, axis=1)
+
+        return counts, n_finite
+
+    def numeric_psi(self, counts: np.ndarray, n_finite: np.ndarray) -> np.ndarray:
+        """
+        PSI per numeric column from numeric_counts() output (or equivalent counts).
+        """
+        counts = np.asarray(counts, dtype=float)
+        eps = 1e-6
+        act = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        act = np.clip(act, eps, None)
+        exp = np.clip(self.expected, eps, None)
+
+        terms = np.where(self.bin_mask, (act - exp) * np.log(act / exp), 0.0)
+        scores = terms.sum(axis=1)
+        # psi() returns 0 below 10 usable rows or without usable edges
+        return np.where(self.has_edges & (np.asarray(n_finite) >= 10), scores, 0.0)
+
+    # ----------------------
+    # categorical
+    # ----------------------
+
+    def categorical_counts(self, current: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Per categorical column: counts over the reference vocabulary,
+        followed by counts of unseen values.
+        """
+        out = []
+        for vocab, c in zip(self.vocab, self.cat_cols):
+            codes, uniques = pd.factorize(current[c].fillna("").astype(str), use_na_sentinel=False)
+            # distinct current value -> reference vocabulary code, unseen values appended
+            mapping = vocab.get_indexer(uniques)
+            unseen = mapping < 0
+            mapping[unseen] = len(vocab) + np.arange(int(unseen.sum()))
+            out.append(np.bincount(mapping[codes], minlength=len(vocab)) if len(codes) else np.zeros(len(vocab)))
+        return out
+
+    def categorical_counts_from_mapping(self, i: int, counts: Dict[str, float]) -> np.ndarray:
+        """
+        Same layout as categorical_counts() from a value -> count mapping.
+        """
+        vocab = self.vocab[i]
+        keys = np.asarray([str(k) for k in counts.keys()], dtype=object)
+        values = np.asarray(list(counts.values()), dtype=float)
+        codes = vocab.get_indexer(keys) if len(keys) else np.zeros(0, dtype=int)
+        unseen = codes < 0
+        codes[unseen] = len(vocab) + np.arange(int(unseen.sum()))
+        return np.bincount(codes, weights=values, minlength=len(vocab))
+
+    def categorical_l1(self, i: int, counts: np.ndarray) -> float:
+        """
+        L1 over the union of the top_k reference and top_k current categories.
+        """
+        counts = np.asarray(counts, dtype=float)
+        n_vocab = len(self.vocab[i])
+        act = counts / max(counts.sum(), 1e-12)
+        exp = np.zeros(len(counts))
+        exp[:n_vocab] = self.exp_freqs[i]
+
+        selected = np.zeros(len(counts), dtype=bool)
+        selected[: min(self.top_k, n_vocab)] = True  # profile freqs are sorted
+        order = np.argsort(-counts, kind="stable")[: self.top_k]
+        selected[order[counts[order] > 0]] = True
+
+        return float(np.abs(act[selected] - exp[selected]).sum())
+
+    # ----------------------
+    # report
+    # ----------------------
+
+    def report(
+        self,
+        num_counts: np.ndarray,
+        n_finite: np.ndarray,
+        cat_counts: List[np.ndarray],
+        n_current: int,
+        psi_threshold: float = 0.2,
+        cat_threshold: float = 0.2,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        num_scores = dict(zip(self.num_cols, self.numeric_psi(num_counts, n_finite).tolist()))
+        cat_scores = {c: self.categorical_l1(i, cat_counts[i]) for i, c in enumerate(self.cat_cols)}
+        return summarize_drift(
+            num_scores,
+            cat_scores,
+            n_reference=self.n_reference,
+            n_current=n_current,
+            psi_threshold=psi_threshold,
+            cat_threshold=cat_threshold,
+        )
+
+    def compute(
+        self, current: pd.DataFrame, psi_threshold: float = 0.2, cat_threshold: float = 0.2
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        num_counts, n_finite = self.numeric_counts(current)
+        cat_counts = self.categorical_counts(current)
+        return self.report(num_counts, n_finite, cat_counts, len(current), psi_threshold, cat_threshold)
+
+
+def compute_drift(
+    reference: Optional[pd.DataFrame],
+    current: pd.DataFrame,
+    num_cols: List[str],
+    cat_cols: List[str],
+    psi_threshold: float = 0.2,
+    cat_threshold: float = 0.2,
+    profile: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Drift of current against a reference drift profile.
+    Without profile, one is built from reference (same scores as psi / cat_l1).
+    """
+    if profile is None:
+        profile = build_drift_profile(reference, num_cols, cat_cols)
+
+    engine = DriftEngine(profile, num_cols, cat_cols)
+    return engine.compute(current, psi_threshold=psi_threshold, cat_threshold=cat_threshold)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import time
+import threading
+from bisect import bisect_right
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ml.drift import DriftEngine
+
+DRIFT_STREAM = os.getenv("DRIFT_STREAM", "1") == "1"
+DRIFT_STREAM_WINDOW_SECONDS = float(os.getenv("DRIFT_STREAM_WINDOW_SECONDS", "3600"))
+DRIFT_STREAM_BUCKET_SECONDS = float(os.getenv("DRIFT_STREAM_BUCKET_SECONDS", "60"))
+# unset: plain sliding window | set: buckets are weighted 0.5 ** (age / half_life)
+DRIFT_STREAM_HALF_LIFE_SECONDS = os.getenv("DRIFT_STREAM_HALF_LIFE_SECONDS")
+
+
+class _Bucket:
+    __slots__ = ("start", "n", "num_counts", "num_n", "cat_counts")
+
+    def __init__(self, start: float, n_num: int, width: int, n_cat: int):
+        self.start = start
+        self.n = 0
+        self.num_counts = np.zeros((n_num, width))
+        self.num_n = np.zeros(n_num)
+        self.cat_counts: List[Counter] = [Counter() for _ in range(n_cat)]
+
+
+class StreamingDrift:
+    """
+    Running per-feature histograms of served predictions.
+
+    Numeric features are binned on the drift profile's reference quantile edges,
+    categorical features are counted per value. Counts live in time buckets,
+    so a drift query is O(buckets x features x bins) whatever the traffic was.
+
+    State is per process: with several uvicorn workers each one sees its own
+    share of the traffic.
+    """
+
+    def __init__(
+        self,
+        profile: Dict[str, Any],
+        num_cols: List[str],
+        cat_cols: List[str],
+        window_seconds: float = DRIFT_STREAM_WINDOW_SECONDS,
+        bucket_seconds: float = DRIFT_STREAM_BUCKET_SECONDS,
+        half_life_seconds: Optional[float] = None,
+    ):
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.half_life_seconds = half_life_seconds
+        # reference side, fixed for the model version
+        self.engine = DriftEngine(profile, self.num_cols, self.cat_cols)
+        self.n_reference = self.engine.n_reference
+        self._edge_lists = [
+            (profile["numeric"].get(c) or {}).get("edges") if has else None
+            for c, has in zip(self.num_cols, self.engine.has_edges)
+        ]
+
+        self._buckets: Deque[_Bucket] = deque()
+        self._lock = threading.Lock()
+
+    # ----------------------
+    # updates
+    # ----------------------
+
+    def _current_bucket(self, now: float) -> _Bucket:
+        start = now - (now % self.bucket_seconds)
+        if not self._buckets or self._buckets[-1].start != start:
+            self._buckets.append(_Bucket(start, len(self.num_cols), self.engine.width, len(self.cat_cols)))
+        # expire buckets that left the window
+        while self._buckets[0].start + self.bucket_seconds <= now - self.window_seconds:
+            self._buckets.popleft()
+        return self._buckets[-1]
+
+    def observe(self, features: Dict[str, Any], now: Optional[float] = None) -> None:
+        """
+        Adds one sanitized feature dict.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self._current_bucket(now)
+            bucket.n += 1
+
+            for i, c in enumerate(self.num_cols):
+                x = features.get(c)
+                if x is None or not np.isfinite(x):
+                    continue
+                bucket.num_n[i] += 1
+                edges = self._edge_lists[i]
+                if edges is None or x < edges[0] or x > edges[-1]:
+                    continue
+                # np.histogram bins: [e0, e1), ..., [e_k-1, e_k]
+                idx = min(bisect_right(edges, x) - 1, len(edges) - 2)
+                bucket.num_counts[i][idx] += 1
+
+            for i, c in enumerate(self.cat_cols):
+                bucket.cat_counts[i][str(features.get(c, ""))] += 1
+
+    def observe_frame(self, frame: pd.DataFrame, now: Optional[float] = None) -> None:
+        """
+        Adds a sanitized batch (see sanitize_frame) in one go.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self._current_bucket(now)
+            bucket.n += len(frame)
+
+            counts, n_finite = self.engine.numeric_counts(frame)
+            bucket.num_counts += counts
+            bucket.num_n += n_finite
+
+            for i, c in enumerate(self.cat_cols):
+                bucket.cat_counts[i].update(frame[c].astype(str).value_counts().to_dict())
+
+    # ----------------------
+    # queries
+    # ----------------------
+
+    def _window_counts(
+        self, now: float, window_seconds: float
+    ) -> Tuple[np.ndarray, np.ndarray, List[Counter], float]:
+        num_counts = np.zeros((len(self.num_cols), self.engine.width))
+        num_n = np.zeros(len(self.num_cols))
+        cat_counts: List[Counter] = [Counter() for _ in self.cat_cols]
+        n_rows = 0.0
+
+        for bucket in self._buckets:
+            age = now - bucket.start
+            if age - self.bucket_seconds >= window_seconds:
+                continue
+            w = 0.5 ** (age / self.half_life_seconds) if self.half_life_seconds else 1.0
+
+            n_rows += w * bucket.n
+            num_counts += w * bucket.num_counts
+            num_n += w * bucket.num_n
+            for i, counts in enumerate(bucket.cat_counts):
+                for k, v in counts.items():
+                    cat_counts[i][k] += w * v
+
+        return num_counts, num_n, cat_counts, n_rows
+
+    def check(
+        self,
+        window_seconds: Optional[float] = None,
+        psi_threshold: float = 0.2,
+        cat_threshold: float = 0.2,
+        now: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Same (summary, details) report as compute_drift, from the running counts.
+        With half-life decay n_current is the effective (weighted) row count.
+        """
+        now = time.time() if now is None else now
+        if window_seconds is None or window_seconds > self.window_seconds:
+            window_seconds = self.window_seconds
+
+        with self._lock:
+            num_counts, num_n, cat_counts, n_rows = self._window_counts(now, window_seconds)
+
+        cat = [self.engine.categorical_counts_from_mapping(i, counts) for i, counts in enumerate(cat_counts)]
+        summary, details = self.engine.report(
+            num_counts,
+            num_n,
+            cat,
+            n_current=int(round(n_rows)),
+            psi_threshold=psi_threshold,
+            cat_threshold=cat_threshold,
+        )
+        summary["window_seconds"] = window_seconds
+        summary["half_life_seconds"] = self.half_life_seconds
+        return summary, details
+
+
+_monitor: Optional[StreamingDrift] = None
+_monitor_version: Optional[str] = None
+_monitor_lock = threading.Lock()
+
+
+def get_stream_monitor(bundle: Any) -> Optional[StreamingDrift]:
+    """
+    The running monitor for bundle's model version, rebuilt (empty) when the
+    active version changes. None when DRIFT_STREAM is off.
+    """
+    global _monitor, _monitor_version
+    if not DRIFT_STREAM:
+        return None
+    if _monitor is not None and _monitor_version == bundle.model_version:
+        return _monitor
+
+    with _monitor_lock:
+        if _monitor is None or _monitor_version != bundle.model_version:
+            half_life = float(DRIFT_STREAM_HALF_LIFE_SECONDS) if DRIFT_STREAM_HALF_LIFE_SECONDS else None
+            _monitor = StreamingDrift(
+                bundle.profile,
+                bundle.schema.get("num_cols", []),
+                bundle.schema.get("cat_cols", []),
+                half_life_seconds=half_life,
+            )
+            _monitor_version = bundle.model_version
+        return _monitor
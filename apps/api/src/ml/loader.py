@@ -1,48 +1,141 @@
 import os
+import re
 import json
+import time
+import threading
 import joblib
-import boto3
+import pandas as pd
 from io import BytesIO
-from functools import lru_cache
-from typing import Tuple, Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Tuple, Any, Callable, Dict, List, Optional, Union
+
+from src.ml.artifact_cache import artifact_cache
+from src.ml.artifact_store import ARTIFACT_FETCH_WORKERS, ArtifactNotFound, artifact_store
+from src.ml.compiled import CompiledLinearModel, compile_pipeline, parity_error
+from src.ml.drift import build_drift_profile
 
 # ======================
 # Environment
 # ======================
 
-MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://minio:9000")
-MINIO_BUCKET = os.getenv("MINIO_BUCKET", "mlops-artifacts")
-MINIO_ACCESS_KEY = os.getenv("MINIO_ROOT_USER")
-MINIO_SECRET_KEY = os.getenv("MINIO_ROOT_PASSWORD")
+# load model.joblib from the disk cache with numpy arrays memory-mapped (shared between workers)
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1") == "1"
 
 MODEL_PREFIX = os.getenv("MODEL_PREFIX", "churn_model")
 LATEST_KEY = f"{MODEL_PREFIX}/latest.json"
+# a version name is one key segment: no "/", and not "." or ".."
+VERSION_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+# pandas-free single-row scoring, see src.ml.compiled
+PREDICT_FAST_PATH = os.getenv("PREDICT_FAST_PATH", "1") == "1"
+FAST_PATH_TOLERANCE = float(os.getenv("FAST_PATH_TOLERANCE", "1e-9"))
+
+# reference rows scored on a freshly loaded model before it takes traffic
+MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", "64"))
+
+# versions kept loaded, the active one included (plus pinned requests, splits, shadows);
+# least recently used ones are evicted past either limit, the active one never
+MODEL_POOL_SIZE = int(os.getenv("MODEL_POOL_SIZE", "3"))
+MODEL_POOL_MAX_MB = float(os.getenv("MODEL_POOL_MAX_MB", "2048"))
 
 
 # ======================
-# MinIO / S3 client
+# Artifact store
 # ======================
 
-def s3_client():
+def read_object(key: str) -> bytes:
+    """
+    Reads an object from the artifact store and returns raw bytes.
+    """
+    return artifact_store.read(key)
+
+
+def download_object(key: str) -> bytes:
+    """
+    Like read_object, but on S3 objects above MULTIPART_THRESHOLD_MB are
+    fetched as parallel ranged GETs.
+    """
+    return artifact_store.read_large(key)
+
+
+def fetch_artifacts(
+    base: str,
+    names: Dict[str, bool],
+    manifest: Optional[dict] = None,
+) -> Tuple[Dict[str, Union[bytes, str, None]], Dict[str, float], Dict[str, str]]:
     """
-    Creates a MinIO-compatible S3 client.
+    Fetches {base}/{name} for all names concurrently.
+
+    names maps artifact name -> required. A missing optional artifact comes
+    back as None; a missing required one raises.
+
+    On a store with local files (ARTIFACT_STORE=local) every artifact comes
+    back as its path in the store, read in place. Otherwise artifacts listed
+    in the version's manifest (sha256 per file) go through the local disk
+    cache and come back as a verified file path; the rest are read into
+    memory and come back as bytes.
+    Returns (name -> bytes | path, name -> seconds, name -> "local" | "cache" | "download" | "memory").
     """
-    return boto3.client(
-        "s3",
-        endpoint_url=MINIO_ENDPOINT,
-        aws_access_key_id=MINIO_ACCESS_KEY,
-        aws_secret_access_key=MINIO_SECRET_KEY,
-        region_name="us-east-1",
+    entries = (manifest or {}).get("artifacts", {}) if artifact_cache is not None else {}
+
+    def fetch(name: str) -> Tuple[Union[bytes, str, None], float, str]:
+        start = time.perf_counter()
+        key = f"{base}/{name}"
+        entry = entries.get(name)
+        try:
+            path = artifact_store.local_path(key)
+            if path is not None:
+                raw, source = path, "local"
+            elif entry:
+                raw, hit = artifact_cache.fetch(
+                    entry["sha256"],
+                    entry.get("size"),
+                    lambda tmp: artifact_store.download(key, tmp),
+                )
+                source = "cache" if hit else "download"
+            else:
+                raw = download_object(key) if name.endswith(".joblib") else read_object(key)
+                source = "memory"
+        except ArtifactNotFound:
+            if names[name]:
+                raise
+            raw, source = None, "missing"
+        return raw, time.perf_counter() - start, source
+
+    with ThreadPoolExecutor(max_workers=max(1, ARTIFACT_FETCH_WORKERS), thread_name_prefix="artifact-fetch") as pool:
+        futures = {name: pool.submit(fetch, name) for name in names}
+        results = {name: f.result() for name, f in futures.items()}
+
+    return (
+        {n: r[0] for n, r in results.items()},
+        {n: r[1] for n, r in results.items()},
+        {n: r[2] for n, r in results.items()},
     )
 
 
-def read_object(key: str) -> bytes:
+def read_manifest(base: str) -> Optional[dict]:
     """
-    Reads an object from MinIO and returns raw bytes.
+    {base}/manifest.json ({"artifacts": {name: {"sha256", "size"}}}),
+    None for versions published without one.
     """
-    s3 = s3_client()
-    obj = s3.get_object(Bucket=MINIO_BUCKET, Key=key)
-    return obj["Body"].read()
+    try:
+        return json.loads(read_object(f"{base}/manifest.json").decode("utf-8"))
+    except ArtifactNotFound:
+        return None
+
+
+def _as_file(src: Union[bytes, str]) -> Union[BytesIO, str]:
+    return src if isinstance(src, str) else BytesIO(src)
+
+
+def _read_json(src: Union[bytes, str]) -> dict:
+    if isinstance(src, str):
+        with open(src, "rb") as f:
+            src = f.read()
+    return json.loads(src.decode("utf-8"))
 
 
 # ======================
@@ -56,16 +149,369 @@ def get_latest_info() -> dict:
         "model_version": "...",
         "prefix": "churn_model"
     }
+
+    Always hits the object store. The request path should go through
+    get_artifacts() instead, which resolves the pointer once per version.
     """
     raw = read_object(LATEST_KEY)
     return json.loads(raw.decode("utf-8"))
 
 
+# ======================
+# Artifact cache
+# ======================
+
+@dataclass
+class ArtifactBundle:
+    """
+    Everything the API needs for one model version, loaded together:
+    latest.json pointer, pipeline, feature schema (metrics.json),
+    drift reference frame and drift profile (drift_profile.json).
+
+    scorer is the compiled NumPy form of pipeline, or None when the
+    pipeline could not be compiled and predict_proba has to be used.
+    timings holds seconds per artifact fetch and load step, sources where
+    each artifact came from (local store, disk cache, fresh download, in memory).
+    nbytes is the approximate memory footprint (model file + reference frame).
+    """
+    pointer: dict
+    pipeline: Any
+    schema: dict
+    reference: pd.DataFrame
+    profile: dict
+    scorer: Optional[CompiledLinearModel] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    sources: Dict[str, str] = field(default_factory=dict)
+    nbytes: int = 0
+
+    @property
+    def model_version(self) -> str:
+        return self.pointer["model_version"]
+
+    @property
+    def prefix(self) -> str:
+        return self.pointer.get("prefix", MODEL_PREFIX)
+
+
+def load_bundle(pointer: dict) -> ArtifactBundle:
+    """
+    Downloads and deserializes all artifacts of the version named by pointer.
+    """
+    model_version = pointer["model_version"]
+    prefix = pointer.get("prefix", MODEL_PREFIX)
+    base = f"{prefix}/{model_version}"
+
+    start = time.perf_counter()
+    # the manifest addresses the disk cache, which a local store doesn't use
+    use_cache = artifact_cache is not None and not artifact_store.local_files
+    manifest = read_manifest(base) if use_cache else None
+    timings = {"fetch:manifest.json": time.perf_counter() - start}
+
+    raw, fetch_seconds, sources = fetch_artifacts(base, {
+        "model.joblib": True,
+        "metrics.json": True,
+        "reference.parquet": True,
+        # versions trained before the trainer published drift profiles don't have one
+        "drift_profile.json": False,
+    }, manifest)
+    timings.update({f"fetch:{name}": secs for name, secs in fetch_seconds.items()})
+
+    start = time.perf_counter()
+    model_src = raw["model.joblib"]
+    if isinstance(model_src, str) and MODEL_MMAP:
+        # arrays stay in the cached file, pages are shared by every worker
+        pipe = joblib.load(model_src, mmap_mode="r")
+    else:
+        pipe = joblib.load(_as_file(model_src))
+    schema = _read_json(raw["metrics.json"])
+    reference = pd.read_parquet(_as_file(raw["reference.parquet"]))
+
+    if raw["drift_profile.json"] is not None:
+        profile = _read_json(raw["drift_profile.json"])
+    else:
+        profile = build_drift_profile(reference, schema.get("num_cols", []), schema.get("cat_cols", []))
+    timings["deserialize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scorer = compile_scorer(pipe, schema, reference) if PREDICT_FAST_PATH else None
+    timings["compile"] = time.perf_counter() - start
+
+    model_nbytes = os.path.getsize(model_src) if isinstance(model_src, str) else len(model_src)
+
+    return ArtifactBundle(
+        pointer=pointer,
+        pipeline=pipe,
+        schema=schema,
+        reference=reference,
+        profile=profile,
+        scorer=scorer,
+        timings=timings,
+        sources=sources,
+        nbytes=int(model_nbytes + reference.memory_usage(deep=True).sum()),
+    )
+
+
+def compile_scorer(pipe: Any, schema: dict, reference: pd.DataFrame) -> Optional[CompiledLinearModel]:
+    """
+    Compiles pipe for single-row scoring and checks it against
+    pipe.predict_proba on the reference frame.
+    Returns None (sklearn fallback) if it can't be compiled or doesn't match.
+    """
+    scorer = compile_pipeline(pipe)
+    if scorer is None:
+        return None
+
+    # sanitize_features only emits schema columns
+    known = set(schema.get("num_cols", [])) | set(schema.get("cat_cols", []))
+    if not set(scorer.num_cols + scorer.cat_cols) <= known:
+        return None
+
+    if parity_error(scorer, pipe, reference) > FAST_PATH_TOLERANCE:
+        return None
+
+    return scorer
+
+
+def warmup_bundle(bundle: ArtifactBundle, rows: int = MODEL_WARMUP_ROWS) -> None:
+    """
+    Runs a few reference rows through both scoring paths so the first
+    real requests on a new version don't pay for lazy init / cold caches.
+    """
+    if rows <= 0 or bundle.reference.empty:
+        return
+    sample = bundle.reference.head(rows)
+    bundle.pipeline.predict_proba(sample)
+    if bundle.scorer is not None:
+        for features in sample.to_dict(orient="records"):
+            bundle.scorer.predict_proba_one(features)
+
+
+class ModelRegistry:
+    """
+    Holds the active artifact bundle plus an LRU pool of other loaded versions.
+
+    - The first lookup loads latest synchronously; after that the request path
+      does no object-store I/O.
+    - reload() downloads, deserializes and warms the new version on a
+      background thread while requests keep using the current bundle, then
+      swaps it in with a single reference assignment. A failed reload keeps
+      the current version.
+    - get_version() serves pinned versions (?model_version=, traffic splits,
+      shadow scoring) from the pool, loading them on first use. The pool is
+      bounded by MODEL_POOL_SIZE versions and MODEL_POOL_MAX_MB; the active
+      version is never evicted.
+    """
+
+    def __init__(self, pool_size: int = MODEL_POOL_SIZE, pool_max_mb: float = MODEL_POOL_MAX_MB):
+        self._lock = threading.Lock()
+        self._pool_load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-reload")
+        self._preloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-preload")
+        self._pending: Optional[Future] = None
+        self._preloading: Dict[str, Future] = {}
+        self._active: Optional[ArtifactBundle] = None
+        self.bundles: "OrderedDict[str, ArtifactBundle]" = OrderedDict()
+        self.pool_size = pool_size
+        self.pool_max_bytes = pool_max_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_reload: dict = {}
+        self._listeners: List[Callable[[ArtifactBundle], None]] = []
+        self._reload_listeners: List[Callable[[dict], None]] = []
+
+    @property
+    def active_version(self) -> Optional[str]:
+        active = self._active
+        return active.model_version if active is not None else None
+
+    def get(self) -> ArtifactBundle:
+        # fast path: one attribute read, no lock
+        bundle = self._active
+        if bundle is not None:
+            self.hits += 1
+            return bundle
+
+        # cold start: one loader at a time, concurrent callers wait for it
+        with self._lock:
+            if self._active is not None:
+                self.hits += 1
+                return self._active
+
+            self.misses += 1
+            bundle = load_bundle(get_latest_info())
+            self._activate(bundle)
+            return bundle
+
+    def get_version(self, model_version: str) -> ArtifactBundle:
+        """
+        Bundle of a specific version, loaded into the pool on first use.
+        Raises ArtifactNotFound if the version doesn't exist in the artifact store
+        or isn't a valid version name (which never reaches the store as a key).
+        """
+        if not VERSION_NAME.fullmatch(model_version):
+            raise ArtifactNotFound(f"{MODEL_PREFIX}/{model_version}")
+        active = self._active
+        if active is not None and active.model_version == model_version:
+            self.hits += 1
+            return active
+
+        with self._lock:
+            bundle = self.bundles.get(model_version)
+            if bundle is not None:
+                self.bundles.move_to_end(model_version)
+                self.hits += 1
+                return bundle
+
+        # pinned versions load one at a time, outside the lock the request path uses
+        with self._pool_load_lock:
+            bundle = self.bundles.get(model_version)
+            if bundle is not None:
+                self.hits += 1
+                return bundle
+            self.misses += 1
+            bundle = load_bundle({"model_version": model_version, "prefix": MODEL_PREFIX})
+            warmup_bundle(bundle)
+            with self._lock:
+                self.bundles[model_version] = bundle
+                self._evict()
+            return bundle
+
+    def peek(self, model_version: str) -> Optional[ArtifactBundle]:
+        """
+        Bundle of model_version if it is already loaded, without loading it.
+        """
+        active = self._active
+        if active is not None and active.model_version == model_version:
+            return active
+        return self.bundles.get(model_version)
+
+    def preload(self, model_version: str) -> Future:
+        """
+        Loads model_version into the pool in the background (or joins that load).
+        """
+        with self._lock:
+            future = self._preloading.get(model_version)
+            if future is None or future.done():
+                future = self._preloader.submit(self.get_version, model_version)
+                self._preloading[model_version] = future
+            return future
+
+    def _evict(self) -> None:
+        # caller holds self._lock
+        active = self.active_version
+        for version in list(self.bundles):
+            if len(self.bundles) <= self.pool_size and self.pool_bytes() <= self.pool_max_bytes:
+                break
+            if version != active:
+                del self.bundles[version]
+                self.evictions += 1
+
+    def pool_bytes(self) -> int:
+        return sum(b.nbytes for b in self.bundles.values())
+
+    def add_listener(self, fn: Callable[[ArtifactBundle], None]) -> None:
+        """
+        Calls fn(bundle) whenever a bundle becomes the active version
+        (cold start and every reload). fn runs under the registry lock: keep it short.
+        """
+        self._listeners.append(fn)
+
+    def add_reload_listener(self, fn: Callable[[dict], None]) -> None:
+        """
+        Calls fn(status) with the final last_reload status of every reload, ready or failed.
+        """
+        self._reload_listeners.append(fn)
+
+    def _activate(self, bundle: ArtifactBundle) -> None:
+        # caller holds self._lock
+        self.bundles[bundle.model_version] = bundle
+        self.bundles.move_to_end(bundle.model_version)
+        self._active = bundle
+        self._evict()
+        for fn in self._listeners:
+            fn(bundle)
+
+    def _reload(self, pointer: Optional[dict] = None) -> dict:
+        status = {
+            "status": "loading",
+            "previous_version": self.active_version,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.last_reload = status
+        try:
+            start = time.perf_counter()
+            bundle = load_bundle(pointer or get_latest_info())
+            status["model_version"] = bundle.model_version
+            status["load_seconds"] = time.perf_counter() - start
+            status["artifact_seconds"] = bundle.timings
+            status["artifact_sources"] = bundle.sources
+
+            start = time.perf_counter()
+            warmup_bundle(bundle)
+            status["warmup_seconds"] = time.perf_counter() - start
+        except Exception as e:
+            status.update(status="failed", error=repr(e), finished_at=datetime.now(timezone.utc).isoformat())
+            self._notify_reload(status)
+            raise
+
+        with self._lock:
+            self._activate(bundle)
+            self.misses += 1
+        status.update(status="ready", finished_at=datetime.now(timezone.utc).isoformat())
+        self._notify_reload(status)
+        return status
+
+    def _notify_reload(self, status: dict) -> None:
+        for fn in self._reload_listeners:
+            fn(status)
+
+    def reload(self, pointer: Optional[dict] = None) -> Future:
+        """
+        Starts loading the version latest.json points to, or the one in
+        pointer if the caller already read it (or joins the reload already
+        in flight). The Future resolves to the reload status dict.
+        """
+        with self._lock:
+            if self._pending is None or self._pending.done():
+                self._pending = self._executor.submit(self._reload, pointer)
+            return self._pending
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        bundle = self._active
+        return {
+            "model_version": self.active_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "fast_path": bundle is not None and bundle.scorer is not None,
+            "artifact_seconds": bundle.timings if bundle is not None else {},
+            "artifact_sources": bundle.sources if bundle is not None else {},
+            "pool": {v: b.nbytes for v, b in self.bundles.items()},
+            "pool_bytes": self.pool_bytes(),
+            "pool_size": self.pool_size,
+            "pool_max_bytes": self.pool_max_bytes,
+            "evictions": self.evictions,
+            "disk_cache": artifact_cache.stats() if artifact_cache is not None else None,
+        }
+
+
+model_registry = ModelRegistry()
+
+
+def get_artifacts() -> ArtifactBundle:
+    """
+    Returns the artifact bundle of the active model version,
+    loading it from MinIO on first use.
+    """
+    return model_registry.get()
+
+
 # ======================
 # Model loading
 # ======================
 
-@lru_cache(maxsize=1)
 def load_model_cached() -> Tuple[Any, str]:
     """
     Loads the latest model pipeline from MinIO.
@@ -73,32 +519,26 @@ def load_model_cached() -> Tuple[Any, str]:
     Returns:
         (pipeline, model_version)
 
-    This function is cached in-memory.
+    Served from the model registry.
     To force reload, call reload_model().
     """
-    latest = get_latest_info()
+    bundle = get_artifacts()
+    return bundle.pipeline, bundle.model_version
 
-    model_version = latest["model_version"]
-    prefix = latest.get("prefix", MODEL_PREFIX)
 
-    model_key = f"{prefix}/{model_version}/model.joblib"
-    model_bytes = read_object(model_key)
-
-    pipe = joblib.load(BytesIO(model_bytes))
-
-    return pipe, model_version
-
-
-def reload_model() -> Tuple[Any, str]:
+def reload_model(wait: bool = True) -> dict:
     """
-    Clears the in-memory cache and reloads the latest model.
+    Loads and warms the latest model in the background, then swaps it in.
+    In-flight requests keep the current model.
 
-    Used by /model/reload endpoint.
+    Used by /model/reload endpoint. Returns the reload status
+    (timings once finished, status="loading" if wait=False).
     """
+    future = model_registry.reload()
+    if not wait:
+        return {"status": "loading", "previous_version": model_registry.active_version}
     try:
-        load_model_cached.cache_clear()
+        future.result()
     except Exception:
-        # cache may not exist yet
-        pass
-
-    return load_model_cached()
+        pass  # recorded in last_reload, the current version keeps serving
+    return model_registry.last_reload
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 import pandas as pd
 
+from src.ml.compiled import CompiledLinearModel
+
 
 def sanitize_features(features: Dict[str, Any], num_cols: List[str], cat_cols: List[str]) -> Dict[str, Any]:
     """
@@ -38,5 +40,38 @@ def sanitize_features(features: Dict[str, Any], num_cols: List[str], cat_cols: L
     return clean
 
 
-def to_dataframe(features: Dict[str, Any]) -> pd.DataFrame:
-    return pd.DataFrame([features])
+def to_dataframe(features: Union[Dict[str, Any], List[Dict[str, Any]]]) -> pd.DataFrame:
+    # one sanitized dict, or a list of them (same keys) for one row each
+    return pd.DataFrame(features if isinstance(features, list) else [features])
+
+
+def predict_proba_one(pipe: Any, scorer: Optional[CompiledLinearModel], features: Dict[str, Any]) -> float:
+    """
+    Churn probability for one sanitized feature dict.
+    Uses the compiled scorer when available, the sklearn pipeline otherwise.
+    """
+    if scorer is not None:
+        return scorer.predict_proba_one(features)
+    return float(pipe.predict_proba(to_dataframe(features))[:, 1][0])
+
+
+def sanitize_frame(records: List[Dict[str, Any]], num_cols: List[str], cat_cols: List[str]) -> pd.DataFrame:
+    """
+    Column-wise equivalent of sanitize_features() for many records at once:
+    - Only keeps columns in num_cols + cat_cols (in that order)
+    - Casts numeric columns to float, unparseable / missing -> 0.0
+    - Casts categorical columns to str, missing -> ""
+    """
+    # built as object from the start: no float inference (1 and a missing value
+    # would become 1.0 / NaN), so str() casts match the per-dict path
+    df = pd.DataFrame(records, columns=num_cols + cat_cols, dtype=object)
+
+    for c in num_cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype(float).fillna(0.0)
+
+    for c in cat_cols:
+        col = df[c]
+        missing = col.isna()
+        df[c] = col.astype(str).where(~missing, "")
+
+    return df
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.ml.loader import model_registry
+
+PREDICT_CACHE = os.getenv("PREDICT_CACHE", "0") == "1"
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_TTL_SECONDS = float(os.getenv("PREDICT_CACHE_TTL_SECONDS", "3600"))
+# what a cache hit logs: full (a predictions row, as a miss would) |
+# skip (nothing) | count (an in-memory per-version hit counter only)
+PREDICT_CACHE_HIT_LOG = os.getenv("PREDICT_CACHE_HIT_LOG", "full")
+
+
+def feature_key(features: Dict[str, Any], model_version: str) -> str:
+    """
+    Canonical hash of sanitize_features() output + model_version:
+    key order and JSON formatting don't matter, values do.
+    """
+    payload = json.dumps(features, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{model_version}\x00{payload}".encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Bounded LRU of (probability, prediction) per feature_key, entries expire
+    after ttl_seconds. Cleared whenever a new active model is swapped in.
+    """
+
+    def __init__(self, max_size: int = PREDICT_CACHE_SIZE, ttl_seconds: float = PREDICT_CACHE_TTL_SECONDS, hit_log: str = PREDICT_CACHE_HIT_LOG):
+        if hit_log not in ("full", "skip", "count"):
+            raise ValueError(f"Unknown PREDICT_CACHE_HIT_LOG: {hit_log}")
+        self.max_size = max(1, max_size)
+        self.ttl = ttl_seconds
+        self.hit_log = hit_log
+        self._entries: "OrderedDict[str, Tuple[float, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.hits_by_version: Dict[str, int] = {}
+
+    def get(self, key: str, model_version: str) -> Optional[Tuple[float, int]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if self.hit_log == "count":
+                # stands in for the predictions rows these hits don't write
+                self.hits_by_version[model_version] = self.hits_by_version.get(model_version, 0) + 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, proba: float, pred: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, proba, pred)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hit_log": self.hit_log,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hits_by_version": dict(self.hits_by_version) if self.hit_log == "count" else None,
+        }
+
+
+prediction_cache: Optional[PredictionCache] = PredictionCache() if PREDICT_CACHE else None
+
+if prediction_cache is not None:
+    # a reload may republish a version name with a different model: start over
+    model_registry.add_listener(lambda bundle: prediction_cache.clear())
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.ml.loader import ArtifactBundle, ModelRegistry, model_registry
+from src.ml.predict import sanitize_frame
+
+# "v20240601=0.1,v20240605=0.05": share of unpinned traffic served by each
+# candidate version, the rest goes to the active (latest.json) version
+MODEL_TRAFFIC_SPLIT = os.getenv("MODEL_TRAFFIC_SPLIT", "")
+# "v20240601,v20240605": versions that score every request off the hot path
+MODEL_SHADOW_VERSIONS = os.getenv("MODEL_SHADOW_VERSIONS", "")
+SHADOW_WORKERS = int(os.getenv("SHADOW_WORKERS", "2"))
+# shadow jobs waiting beyond this are dropped rather than queued
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "1000"))
+
+
+def parse_split(value: str) -> Dict[str, float]:
+    split: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        version, _, share = part.partition("=")
+        split[version.strip()] = float(share)
+    return split
+
+
+def parse_versions(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _unit_interval(request_id: str) -> float:
+    # stable per request id, uniform enough for traffic shares
+    return int(hashlib.sha1(request_id.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+
+
+class TrafficRouter:
+    """
+    Decides which model version serves a request and which versions shadow it.
+
+    Explicit ?model_version= pins win; otherwise a request goes to a split
+    candidate with probability equal to its share (hashed on request_id), else
+    to the active version.
+    """
+
+    def __init__(self, split: Optional[Dict[str, float]] = None, shadow: Optional[List[str]] = None):
+        self.split: Dict[str, float] = {}
+        self.shadow: List[str] = []
+        self.configure(split or {}, shadow or [])
+
+    def configure(self, split: Dict[str, float], shadow: List[str]) -> None:
+        if any(share < 0 for share in split.values()) or sum(split.values()) > 1:
+            raise ValueError("traffic shares must be >= 0 and sum to at most 1")
+        # replaced, never mutated: readers see either the old or the new config
+        self.split = dict(split)
+        self.shadow = list(shadow)
+
+    def preload(self, registry: ModelRegistry) -> None:
+        for version in list(self.split) + self.shadow:
+            registry.preload(version)
+
+    def choose(self, request_id: str) -> Optional[str]:
+        """
+        Split candidate for request_id, None for the active version.
+        """
+        split = self.split
+        if not split:
+            return None
+        u = _unit_interval(request_id)
+        for version, share in split.items():
+            if u < share:
+                return version
+            u -= share
+        return None
+
+    def shadows_for(self, serving_version: str) -> List[str]:
+        return [v for v in self.shadow if v != serving_version]
+
+    def config(self) -> dict:
+        return {"split": self.split, "shadow": self.shadow}
+
+
+class ShadowScorer:
+    """
+    Scores requests with shadow versions on a small thread pool after the
+    response is computed, and logs the results to shadow_predictions next to
+    the version that served them. Failures and overload never reach the
+    request path; they are counted in stats().
+    """
+
+    def __init__(self, registry: ModelRegistry, workers: int = SHADOW_WORKERS, max_pending: int = SHADOW_MAX_PENDING):
+        self.registry = registry
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.scored = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+
+    def submit(self, versions: List[str], serving_version: str, request_ids: List[str], records: List[Dict[str, Any]]) -> None:
+        if not versions or not records:
+            return
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += len(versions)
+                return
+            self.pending += 1
+            self.submitted += len(versions)
+        self._executor.submit(self._run, list(versions), serving_version, request_ids, records)
+
+    def _run(self, versions: List[str], serving_version: str, request_ids: List[str], records: List[Dict[str, Any]]) -> None:
+        try:
+            for version in versions:
+                try:
+                    rows = self._score(self.registry.get_version(version), serving_version, request_ids, records)
+                    self._write(rows)
+                    self.scored += 1
+                except Exception as e:
+                    self.failed += 1
+                    self.last_error = repr(e)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    @staticmethod
+    def _score(
+        bundle: ArtifactBundle, serving_version: str, request_ids: List[str], records: List[Dict[str, Any]]
+    ) -> List[dict]:
+        # the candidate may have a different feature schema than the serving version
+        X = sanitize_frame(records, num_cols=bundle.schema.get("num_cols", []), cat_cols=bundle.schema.get("cat_cols", []))
+        proba = bundle.pipeline.predict_proba(X)[:, 1]
+        created_at = datetime.now(timezone.utc)
+        return [
+            {
+                "created_at": created_at,
+                "request_id": request_id,
+                "model_version": bundle.model_version,
+                "serving_version": serving_version,
+                "prediction": int(p >= 0.5),
+                "probability": float(p),
+            }
+            for request_id, p in zip(request_ids, proba)
+        ]
+
+    @staticmethod
+    def _write(rows: List[dict]) -> None:
+        # late import: src.db.session is the engine the app was configured with
+        from sqlmodel import Session
+
+        from src.db import session as db_session
+        from src.db.crud import insert_shadow_predictions
+
+        with Session(db_session.engine) as session:
+            insert_shadow_predictions(session, rows)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "scored": self.scored,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "last_error": self.last_error,
+        }
+
+
+traffic_router = TrafficRouter(parse_split(MODEL_TRAFFIC_SPLIT), parse_versions(MODEL_SHADOW_VERSIONS))
+shadow_scorer = ShadowScorer(model_registry)
+
+
+def resolve_bundle(request_id: str, model_version: Optional[str] = None) -> Tuple[ArtifactBundle, str]:
+    """
+    (bundle, route) for a request: route is "pinned", "split" or "active".
+    A pinned version that can't be loaded raises. A split candidate that
+    isn't loaded yet is loaded in the background while its share of traffic
+    keeps going to the active version.
+    """
+    if model_version:
+        return model_registry.get_version(model_version), "pinned"
+
+    candidate = traffic_router.choose(request_id)
+    if candidate is not None:
+        bundle = model_registry.peek(candidate)
+        if bundle is not None:
+            return bundle, "split"
+        model_registry.preload(candidate)
+    return model_registry.get(), "active"
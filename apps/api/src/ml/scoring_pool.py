@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.ml.loader import ArtifactBundle, load_bundle
+from src.ml.predict import predict_proba_one
+
+# thread: scoring shares the API process (numpy / sklearn release the GIL in places)
+# process: scoring runs in worker processes, each loads the model itself (mmap-shared via the disk cache)
+PREDICT_POOL = os.getenv("PREDICT_POOL", "thread")
+PREDICT_POOL_WORKERS = int(os.getenv("PREDICT_POOL_WORKERS", str(min(8, os.cpu_count() or 1))))
+# auto: the compiled scorer (a few microseconds) runs on the event loop, sklearn goes to the pool
+# always: every prediction goes to the pool
+PREDICT_OFFLOAD = os.getenv("PREDICT_OFFLOAD", "auto")
+
+# per worker process: model_version -> bundle
+_worker_bundles: Dict[str, ArtifactBundle] = {}
+
+
+def _score_in_worker(pointer: dict, features: Dict[str, Any]) -> float:
+    bundle = _worker_bundles.get(pointer["model_version"])
+    if bundle is None:
+        bundle = load_bundle(pointer)
+        # keep the newest two versions (current + one being swapped in/out)
+        while len(_worker_bundles) >= 2:
+            _worker_bundles.pop(next(iter(_worker_bundles)))
+        _worker_bundles[pointer["model_version"]] = bundle
+    return predict_proba_one(bundle.pipeline, bundle.scorer, features)
+
+
+class ScoringPool:
+    """
+    Runs CPU-bound scoring for async handlers off the event loop, on a
+    dedicated pool of PREDICT_POOL_WORKERS threads or processes (separate
+    from the threadpool FastAPI uses for sync handlers).
+    """
+
+    def __init__(self, kind: str = PREDICT_POOL, workers: int = PREDICT_POOL_WORKERS, offload: str = PREDICT_OFFLOAD):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown PREDICT_POOL: {kind}")
+        if offload not in ("auto", "always"):
+            raise ValueError(f"Unknown PREDICT_OFFLOAD: {offload}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.offload = offload
+        self._executor: Optional[Executor] = None
+        self.inline = 0
+        self.offloaded = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: forking a process that runs threads (writer, watcher) isn't safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict")
+        return self._executor
+
+    async def predict_proba_one(self, bundle: ArtifactBundle, features: Dict[str, Any]) -> float:
+        if self.offload == "auto" and bundle.scorer is not None:
+            self.inline += 1
+            return bundle.scorer.predict_proba_one(features)
+
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        if self.kind == "process":
+            return await loop.run_in_executor(self._get_executor(), _score_in_worker, bundle.pointer, features)
+        return await loop.run_in_executor(
+            self._get_executor(), predict_proba_one, bundle.pipeline, bundle.scorer, features
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "offload": self.offload,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+        }
+
+
+scoring_pool = ScoringPool()
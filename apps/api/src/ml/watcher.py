@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.ml.artifact_store import (
+    MINIO_ACCESS_KEY,
+    MINIO_BUCKET,
+    MINIO_ENDPOINT,
+    MINIO_SECRET_KEY,
+    ArtifactStore,
+    artifact_store,
+)
+from src.ml.loader import LATEST_KEY, ModelRegistry, model_registry
+
+# off | poll (conditional read of latest.json) | notify (MinIO bucket notifications, polling as fallback)
+MODEL_WATCH = os.getenv("MODEL_WATCH", "poll")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
+
+
+class PointerWatcher:
+    """
+    Background watcher of latest.json.
+
+    Polls with If-None-Match on the last ETag, so an unchanged pointer costs a
+    304 and no body (on a local store, a stat of the file). When the pointer names a version other than the active
+    one, it starts ModelRegistry.reload() with the pointer it just read.
+    In notify mode it waits on MinIO ObjectCreated events for the pointer key
+    instead (needs the `minio` package and the s3 store) and keeps polling
+    as a safety net.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        interval: float = MODEL_WATCH_INTERVAL,
+        mode: str = MODEL_WATCH,
+        store: ArtifactStore = artifact_store,
+    ):
+        self.registry = registry
+        self.store = store
+        self.interval = interval
+        self.mode = mode
+        self.etag: Optional[str] = None
+        self.pointer: Optional[dict] = None
+        self.polls = 0
+        self.not_modified = 0
+        self.changes = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_poll_at: Optional[str] = None
+        self._stop = threading.Event()
+        self._threads: list = []
+
+    def poll_once(self) -> bool:
+        """
+        One conditional GET of latest.json. Returns True if a reload was started.
+        """
+        self.polls += 1
+        self.last_poll_at = datetime.now(timezone.utc).isoformat()
+
+        content, etag = self.store.read_if_changed(LATEST_KEY, self.etag)
+        if content is None:
+            self.not_modified += 1
+            # unchanged pointer, but a failed reload of it is retried
+            return self._sync(self.pointer)
+
+        self.etag = etag
+        previous = (self.pointer or {}).get("model_version")
+        self.pointer = json.loads(content.decode("utf-8"))
+        if self.pointer.get("model_version") != previous:
+            self.changes += 1
+        return self._sync(self.pointer)
+
+    def _sync(self, pointer: Optional[dict]) -> bool:
+        if pointer is None or pointer.get("model_version") == self.registry.active_version:
+            return False
+        # joins the reload already in flight for this pointer
+        self.registry.reload(pointer=pointer)
+        return True
+
+    def _safe_poll(self) -> None:
+        try:
+            self.poll_once()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = repr(e)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.is_set():
+            self._safe_poll()
+            self._stop.wait(self.interval)
+
+    def _notify_loop(self) -> None:
+        if self.store.name != "s3":
+            self.last_error = f"MODEL_WATCH=notify needs the s3 artifact store, polling {self.store.name} only"
+            return
+        try:
+            from minio import Minio
+        except ImportError:
+            self.last_error = "MODEL_WATCH=notify needs the minio package, polling only"
+            return
+
+        endpoint = MINIO_ENDPOINT.split("://", 1)[-1]
+        client = Minio(
+            endpoint,
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=MINIO_ENDPOINT.startswith("https://"),
+        )
+        while not self._stop.is_set():
+            try:
+                with client.listen_bucket_notification(
+                    MINIO_BUCKET, prefix=LATEST_KEY, events=["s3:ObjectCreated:*"]
+                ) as events:
+                    for _ in events:
+                        self._safe_poll()
+                        if self._stop.is_set():
+                            return
+            except Exception as e:
+                self.errors += 1
+                self.last_error = repr(e)
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self.mode == "off" or self._threads:
+            return
+        targets = [self._poll_loop]
+        if self.mode == "notify":
+            targets.append(self._notify_loop)
+        for target in targets:
+            t = threading.Thread(target=target, name=f"pointer-watcher{target.__name__}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._threads = []
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "store": self.store.name,
+            "interval_seconds": self.interval,
+            "etag": self.etag,
+            "pointer_version": (self.pointer or {}).get("model_version"),
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "changes": self.changes,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_poll_at": self.last_poll_at,
+        }
+
+
+pointer_watcher = PointerWatcher(model_registry)
@@ -1,66 +1,162 @@
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 import pandas as pd
 
+from src.core.metrics import record_drift, stage
 from src.core.security import verify_api_key
 from src.db.session import get_session
 from src.db.models import Prediction, DriftRun
-from src.ml.reference import load_reference_df
-from src.ml.schema import get_feature_schema
-from src.ml.drift import compute_drift
+from src.ml.artifact_store import ArtifactNotFound
+from src.ml.loader import ArtifactBundle, get_artifacts
+from src.db.drift_queries import drift_counts
+from src.ml.drift import DriftEngine, compute_drift
+from src.ml.drift_stream import get_stream_monitor
 
 router = APIRouter(prefix="/drift", tags=["drift"])
 
 
+def _active_bundle() -> ArtifactBundle:
+    try:
+        return get_artifacts()
+    except ArtifactNotFound:
+        # no latest.json (or the version it names) yet: nothing to compare against
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="No model published")
+
+
 @router.get("/check")
 def drift_check(
     _: str = Depends(verify_api_key),
     session: Session = Depends(get_session),
     n: int = Query(200, ge=20, le=2000),
+    source: str = Query("rows", pattern="^(rows|sql)$"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    model_version: Optional[str] = Query(None),
 ):
-    # 1) reference from MinIO
-    reference_df, model_version = load_reference_df()
+    """
+    source=rows: last n predictions are loaded and scored in the API.
+    source=sql:  bin / category counts are computed in Postgres over
+                 [since, until) (last n rows if neither is given), so the
+                 window can span millions of predictions.
+    model_version filters the logged predictions in both modes.
+    """
+    # 1) reference + drift profile (cached per model version)
+    with stage("drift_check", "reference_load"):
+        bundle = _active_bundle()
+    active_version = bundle.model_version
 
     # 2) schema
-    schema = get_feature_schema()
+    schema = bundle.schema
     num_cols = schema.get("num_cols", [])
     cat_cols = schema.get("cat_cols", [])
 
-    # 3) current from DB (last n)
-    q = select(Prediction).order_by(Prediction.id.desc()).limit(n)
-    rows = session.exec(q).all()
-    if len(rows) < 20:
-        return {"detail": "Not enough predictions yet. Call /predict at least 20 times.", "n_current": len(rows)}
-
-    current_df = pd.DataFrame([r.features for r in rows])
-
-    # ensure columns exist
-    for c in num_cols:
-        if c not in current_df.columns:
-            current_df[c] = 0.0
-    for c in cat_cols:
-        if c not in current_df.columns:
-            current_df[c] = ""
-
-    # 4) compute drift
-    summary, details = compute_drift(
-        reference=reference_df,
-        current=current_df,
-        num_cols=num_cols,
-        cat_cols=cat_cols,
-        psi_threshold=0.2,
-        cat_threshold=0.2,
-    )
+    if source == "sql":
+        # 3+4) counts from DB, scores in the API
+        engine = DriftEngine(bundle.profile, num_cols, cat_cols)
+        limit = n if since is None and until is None else None
+        with stage("drift_check", "db_fetch"):
+            num_counts, n_finite, cat_counts, n_current = drift_counts(
+                session, engine, since=since, until=until, model_version=model_version, limit=limit
+            )
+        if n_current < 20:
+            return {"detail": "Not enough predictions in the window.", "n_current": n_current}
+
+        with stage("drift_check", "compute_drift"):
+            summary, details = engine.report(
+                num_counts, n_finite, cat_counts, n_current, psi_threshold=0.2, cat_threshold=0.2
+            )
+    else:
+        # 3) current from DB (last n)
+        q = select(Prediction)
+        if model_version is not None:
+            q = q.where(Prediction.model_version == model_version)
+        if since is not None:
+            q = q.where(Prediction.created_at >= since)
+        if until is not None:
+            q = q.where(Prediction.created_at < until)
+        q = q.order_by(Prediction.created_at.desc(), Prediction.id.desc()).limit(n)
+        with stage("drift_check", "db_fetch"):
+            rows = session.exec(q).all()
+        if len(rows) < 20:
+            return {"detail": "Not enough predictions yet. Call /predict at least 20 times.", "n_current": len(rows)}
+
+        current_df = pd.DataFrame([r.features for r in rows])
+
+        # ensure columns exist
+        for c in num_cols:
+            if c not in current_df.columns:
+                current_df[c] = 0.0
+        for c in cat_cols:
+            if c not in current_df.columns:
+                current_df[c] = ""
+
+        # 4) compute drift
+        with stage("drift_check", "compute_drift"):
+            summary, details = compute_drift(
+                reference=bundle.reference,
+                current=current_df,
+                num_cols=num_cols,
+                cat_cols=cat_cols,
+                psi_threshold=0.2,
+                cat_threshold=0.2,
+                profile=bundle.profile,
+            )
+        n_current = len(rows)
+
+    record_drift(source, summary, details)
 
     # 5) log drift run
     run = DriftRun(
-        model_version=model_version,
-        n_current=len(rows),
+        model_version=active_version,
+        n_current=n_current,
         summary=summary,
         details=details,
     )
-    session.add(run)
-    session.commit()
-    session.refresh(run)
+    with stage("drift_check", "db_commit"):
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+
+    return {"id": run.id, "model_version": active_version, "summary": summary, "details": details}
+
+
+@router.get("/stream")
+def drift_stream(
+    _: str = Depends(verify_api_key),
+    session: Session = Depends(get_session),
+    window_seconds: Optional[float] = Query(None, gt=0),
+    save: bool = Query(True),
+):
+    """
+    Drift over the running histograms kept by /predict: no DB read, cost
+    independent of how many predictions fall in the window.
+    """
+    bundle = _active_bundle()
+    monitor = get_stream_monitor(bundle)
+    if monitor is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Streaming drift is disabled (DRIFT_STREAM=0)")
+
+    with stage("drift_stream", "compute_drift"):
+        summary, details = monitor.check(window_seconds=window_seconds, psi_threshold=0.2, cat_threshold=0.2)
+    if summary["n_current"] < 20:
+        return {"detail": "Not enough predictions in the window yet.", "n_current": summary["n_current"]}
+
+    record_drift("stream", summary, details)
+
+    run_id = None
+    if save:
+        run = DriftRun(
+            model_version=bundle.model_version,
+            n_current=summary["n_current"],
+            summary=summary,
+            details=details,
+        )
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+        run_id = run.id
 
-    return {"id": run.id, "model_version": model_version, "summary": summary, "details": details}
+    return {"id": run_id, "model_version": bundle.model_version, "summary": summary, "details": details}
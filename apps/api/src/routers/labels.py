@@ -0,0 +1,47 @@
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from sqlmodel import Session
+
+from src.core.security import verify_api_key
+from src.db.crud import upsert_labels
+from src.db.session import get_session
+
+router = APIRouter(prefix="/labels", tags=["labels"])
+
+LABELS_BATCH_MAX = int(os.getenv("LABELS_BATCH_MAX", "10000"))
+
+
+class Label(BaseModel):
+    # request_id returned by /predict or /predict/batch
+    request_id: str
+    churn: int = Field(ge=0, le=1)
+
+
+class LabelsRequest(BaseModel):
+    labels: List[Label]
+
+
+@router.post("")
+def ingest_labels(
+    payload: LabelsRequest,
+    _: str = Depends(verify_api_key),
+    session: Session = Depends(get_session),
+):
+    """
+    Records observed churn outcomes of served requests. The trainer's
+    incremental mode joins them to the logged feature vectors.
+    """
+    n = len(payload.labels)
+    if n > LABELS_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {n} labels (max {LABELS_BATCH_MAX})",
+        )
+
+    now = datetime.now(timezone.utc)
+    rows = [{"created_at": now, "request_id": label.request_id, "churn": label.churn} for label in payload.labels]
+    return {"labels": upsert_labels(session, rows)}
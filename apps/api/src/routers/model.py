@@ -1,12 +1,89 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
+from pydantic import BaseModel
+from sqlmodel import Session
 
 from src.core.security import verify_api_key
-from src.ml.loader import reload_model
+from src.db.crud import shadow_comparison
+from src.db.session import get_session
+from src.ml.loader import reload_model, model_registry
+from src.ml.routing import shadow_scorer, traffic_router
+from src.ml.watcher import pointer_watcher
 
 router = APIRouter(prefix="/model", tags=["model"])
 
 
+class RoutingConfig(BaseModel):
+    # version -> share of unpinned traffic, the rest goes to latest.json
+    split: Dict[str, float] = {}
+    # versions that score every request in the background
+    shadow: List[str] = []
+
+
 @router.post("/reload")
-def reload(_: str = Depends(verify_api_key)):
-    _, version = reload_model()
-    return {"status": "reloaded", "model_version": version}
+def reload(
+    _: str = Depends(verify_api_key),
+    wait: bool = Query(True),
+):
+    """
+    wait=true:  returns once the new version serves traffic, with load / warmup timings.
+    wait=false: returns immediately, poll GET /model/status.
+    """
+    status = reload_model(wait=wait)
+    if status.get("status") == "failed":
+        raise HTTPException(status_code=http_status.HTTP_502_BAD_GATEWAY, detail=status)
+    return {**status, "status": "reloaded" if status.get("status") == "ready" else status.get("status")}
+
+
+@router.get("/status")
+def reload_status(_: str = Depends(verify_api_key)):
+    return {
+        "model_version": model_registry.active_version,
+        "last_reload": model_registry.last_reload,
+        "watcher": pointer_watcher.stats(),
+    }
+
+
+@router.get("/cache")
+def cache_stats(_: str = Depends(verify_api_key)):
+    return model_registry.stats()
+
+
+@router.get("/routing")
+def get_routing(_: str = Depends(verify_api_key)):
+    return {"active_version": model_registry.active_version, **traffic_router.config()}
+
+
+@router.put("/routing")
+def put_routing(payload: RoutingConfig, _: str = Depends(verify_api_key)):
+    """
+    Replaces the traffic split / shadow set of this process and starts loading
+    the versions it names. Not persisted: MODEL_TRAFFIC_SPLIT and
+    MODEL_SHADOW_VERSIONS apply again on restart.
+    """
+    try:
+        traffic_router.configure(payload.split, payload.shadow)
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    traffic_router.preload(model_registry)
+    return {"active_version": model_registry.active_version, **traffic_router.config()}
+
+
+@router.get("/shadow")
+def shadow_report(
+    _: str = Depends(verify_api_key),
+    session: Session = Depends(get_session),
+    hours: float = Query(24, gt=0, le=24 * 90),
+    model_version: Optional[str] = Query(None),
+):
+    """
+    Shadow versions vs. the versions that served the same requests.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return {
+        "since": since,
+        "scorer": shadow_scorer.stats(),
+        "comparison": shadow_comparison(session, since, model_version),
+    }
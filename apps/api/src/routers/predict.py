@@ -1,25 +1,94 @@
-from fastapi import APIRouter, Depends
+import os
+import uuid
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import Session, select
 
+from src.core.metrics import stage
 from src.core.security import verify_api_key
 from src.db.session import get_session
+from src.db.async_session import get_async_session
 from src.db.models import Prediction
-from src.ml.loader import load_model_cached
+from src.db.crud import bulk_insert_predictions
+from src.db.writer import get_prediction_writer
+from src.ml.artifact_store import ArtifactNotFound
+from src.ml.loader import ArtifactBundle, model_registry
+from src.ml.routing import resolve_bundle, shadow_scorer, traffic_router
 from src.ml.schema import get_feature_schema
-from src.ml.predict import sanitize_features, to_dataframe
+from src.ml.drift_stream import get_stream_monitor
+from src.ml.scoring_pool import scoring_pool
+from src.ml.batcher import micro_batcher
+from src.ml.result_cache import feature_key, prediction_cache
+from src.ml.predict import sanitize_features, sanitize_frame, to_dataframe
 
 router = APIRouter(prefix="/predict", tags=["predict"])
 
+PREDICT_BATCH_MAX = int(os.getenv("PREDICT_BATCH_MAX", "10000"))
+
 
 class PredictRequest(BaseModel):
     # Esnek: UI schema’dan kolonları alıp buraya dict basacak
     features: dict
 
 
+class BatchPredictRequest(BaseModel):
+    # one feature dict per customer, same shape as PredictRequest.features
+    records: List[dict]
+
+
+def _route(request_id: str, pinned_version: Optional[str]) -> ArtifactBundle:
+    try:
+        bundle, _ = resolve_bundle(request_id, pinned_version)
+    except ArtifactNotFound:
+        if not pinned_version:
+            # no latest.json (or the version it names) yet: nothing to serve
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="No model published")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown model_version: {pinned_version}")
+    return bundle
+
+
+def _is_loaded(pinned_version: Optional[str]) -> bool:
+    # routing to a loaded version is a dict lookup; anything else reads the artifact store
+    if pinned_version:
+        return model_registry.peek(pinned_version) is not None
+    return model_registry.active_version is not None
+
+
+def _cache_lookup(clean: dict, model_version: str):
+    """
+    (cache key, cached (probability, prediction) or None); key is None with PREDICT_CACHE off.
+    """
+    if prediction_cache is None:
+        return None, None
+    key = feature_key(clean, model_version)
+    return key, prediction_cache.get(key, model_version)
+
+
+def _log_hit(cached) -> bool:
+    # misses are always logged, hits per PREDICT_CACHE_HIT_LOG
+    return cached is None or prediction_cache.hit_log == "full"
+
+
+def _observe_drift(bundle: ArtifactBundle):
+    # the running drift window tracks the active version only
+    if bundle.model_version != model_registry.active_version:
+        return None
+    return get_stream_monitor(bundle)
+
+
 @router.get("/schema")
 def schema(_: str = Depends(verify_api_key)):
-    s = get_feature_schema()
+    try:
+        s = get_feature_schema()
+    except ArtifactNotFound:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="No model published")
     return {
         "model_version": s.get("model_version"),
         "num_cols": s.get("num_cols", []),
@@ -30,41 +99,255 @@ def schema(_: str = Depends(verify_api_key)):
 @router.post("")
 def predict(
     payload: PredictRequest,
+    pinned_version: Optional[str] = Query(
+        None, alias="model_version", description="pin a model version instead of latest / traffic split"
+    ),
     _: str = Depends(verify_api_key),
     session: Session = Depends(get_session),
 ):
-    # 1) model + version
-    pipe, model_version = load_model_cached()
+    request_id = str(uuid.uuid4())
+
+    # 1) model + version (one cached bundle, so both come from the same version)
+    with stage("predict", "model_fetch"):
+        bundle = _route(request_id, pinned_version)
+        pipe, model_version = bundle.pipeline, bundle.model_version
 
     # 2) schema
-    schema_info = get_feature_schema()
-    num_cols = schema_info.get("num_cols", [])
-    cat_cols = schema_info.get("cat_cols", [])
+    with stage("predict", "schema_fetch"):
+        schema_info = bundle.schema
+        num_cols = schema_info.get("num_cols", [])
+        cat_cols = schema_info.get("cat_cols", [])
 
     # 3) sanitize payload (drop unknown cols, cast numerics, fill missing)
-    clean = sanitize_features(payload.features, num_cols=num_cols, cat_cols=cat_cols)
-
-    # 4) dataframe -> predict
-    X = to_dataframe(clean)
-    proba = float(pipe.predict_proba(X)[:, 1][0])
-    pred = 1 if proba >= 0.5 else 0
-
-    # 5) log to DB (store clean features!)
-    row = Prediction(
-        model_version=model_version,
-        features=clean,
-        prediction=pred,
-    )
-    session.add(row)
-    session.commit()
-    session.refresh(row)
+    with stage("predict", "sanitize"):
+        clean = sanitize_features(payload.features, num_cols=num_cols, cat_cols=cat_cols)
+
+    # 4) predict (compiled NumPy path, DataFrame + pipeline as fallback,
+    #    batched with concurrent requests when PREDICT_BATCHING applies),
+    #    repeated payloads come from the result cache when PREDICT_CACHE is on
+    with stage("predict", "cache_lookup"):
+        cache_key, cached = _cache_lookup(clean, model_version)
+    if cached is not None:
+        proba, pred = cached
+    else:
+        if micro_batcher.applies(bundle):
+            with stage("predict", "predict_proba_batched"):
+                proba = micro_batcher.predict_proba_one(bundle, clean)
+        elif bundle.scorer is not None:
+            with stage("predict", "predict_proba"):
+                proba = bundle.scorer.predict_proba_one(clean)
+        else:
+            with stage("predict", "dataframe"):
+                X = to_dataframe(clean)
+            with stage("predict", "predict_proba"):
+                proba = float(pipe.predict_proba(X)[:, 1][0])
+        pred = 1 if proba >= 0.5 else 0
+        if cache_key is not None:
+            prediction_cache.put(cache_key, proba, pred)
+
+    monitor = _observe_drift(bundle)
+    if monitor is not None:
+        monitor.observe(clean)
+
+    row_id = None
+    if _log_hit(cached):
+        # candidates score the same features off the hot path
+        shadow_scorer.submit(traffic_router.shadows_for(model_version), model_version, [request_id], [clean])
+
+        # 5) log to DB (store clean features!)
+        row = Prediction(
+            request_id=request_id,
+            model_version=model_version,
+            features=clean,
+            prediction=pred,
+        )
+
+        writer = get_prediction_writer()
+        if writer is not None:
+            # write-behind: the DB id doesn't exist yet, request_id identifies the row
+            with stage("predict", "log_enqueue"):
+                writer.submit(row.model_dump(exclude={"id"}))
+        else:
+            with stage("predict", "db_commit"):
+                session.add(row)
+                session.commit()
+                session.refresh(row)
+            row_id = row.id
 
     return {
         "prediction": pred,
         "probability": proba,
         "model_version": model_version,
-        "id": row.id,
+        "id": row_id,
+        "request_id": request_id,
+        "cached": cached is not None,
+    }
+
+
+@router.post("/async")
+async def predict_async(
+    payload: PredictRequest,
+    pinned_version: Optional[str] = Query(
+        None, alias="model_version", description="pin a model version instead of latest / traffic split"
+    ),
+    _: str = Depends(verify_api_key),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Same contract as POST /predict, without blocking calls on the event loop:
+    model loads (object store) run on a worker thread, sklearn scoring on the
+    scoring pool, the log insert over asyncpg.
+    """
+    request_id = str(uuid.uuid4())
+
+    # 1) model: a plain lookup once loaded, a cold load goes off the loop
+    with stage("predict_async", "model_fetch"):
+        if _is_loaded(pinned_version):
+            bundle = _route(request_id, pinned_version)
+        else:
+            bundle = await run_in_threadpool(_route, request_id, pinned_version)
+    model_version = bundle.model_version
+
+    # 2) sanitize
+    with stage("predict_async", "sanitize"):
+        clean = sanitize_features(
+            payload.features,
+            num_cols=bundle.schema.get("num_cols", []),
+            cat_cols=bundle.schema.get("cat_cols", []),
+        )
+
+    # 3) predict
+    cache_key, cached = _cache_lookup(clean, model_version)
+    if cached is not None:
+        proba, pred = cached
+    else:
+        if micro_batcher.applies(bundle):
+            with stage("predict_async", "predict_proba_batched"):
+                proba = await asyncio.wrap_future(micro_batcher.submit(bundle, clean))
+        else:
+            with stage("predict_async", "predict_proba"):
+                proba = await scoring_pool.predict_proba_one(bundle, clean)
+        pred = 1 if proba >= 0.5 else 0
+        if cache_key is not None:
+            prediction_cache.put(cache_key, proba, pred)
+
+    monitor = _observe_drift(bundle)
+    if monitor is not None:
+        monitor.observe(clean)
+
+    # 4) log
+    row_id = None
+    if _log_hit(cached):
+        shadow_scorer.submit(traffic_router.shadows_for(model_version), model_version, [request_id], [clean])
+
+        row = Prediction(request_id=request_id, model_version=model_version, features=clean, prediction=pred)
+        writer = get_prediction_writer()
+        if writer is not None:
+            row_dict = row.model_dump(exclude={"id"})
+            with stage("predict_async", "log_enqueue"):
+                if writer.policy == "drop":
+                    writer.submit(row_dict)
+                else:
+                    # policy=block may wait for queue space
+                    await run_in_threadpool(writer.submit, row_dict)
+        else:
+            with stage("predict_async", "db_commit"):
+                result = await session.execute(
+                    insert(Prediction).values(**row.model_dump(exclude={"id"})).returning(Prediction.id)
+                )
+                row_id = result.scalar_one()
+                await session.commit()
+
+    return {
+        "prediction": pred,
+        "probability": proba,
+        "model_version": model_version,
+        "id": row_id,
+        "request_id": request_id,
+        "cached": cached is not None,
+    }
+
+
+@router.post("/batch")
+def predict_batch(
+    payload: BatchPredictRequest,
+    pinned_version: Optional[str] = Query(
+        None, alias="model_version", description="pin a model version instead of latest / traffic split"
+    ),
+    _: str = Depends(verify_api_key),
+    session: Session = Depends(get_session),
+):
+    n = len(payload.records)
+    if n > PREDICT_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {n} records (max {PREDICT_BATCH_MAX})",
+        )
+    if n == 0:
+        return {"model_version": None, "n": 0, "results": []}
+
+    # 1) model + schema from one cached bundle (the whole batch is routed together)
+    request_ids = [str(uuid.uuid4()) for _ in range(n)]
+    with stage("predict_batch", "model_fetch"):
+        bundle = _route(request_ids[0], pinned_version)
+        pipe, model_version = bundle.pipeline, bundle.model_version
+        num_cols = bundle.schema.get("num_cols", [])
+        cat_cols = bundle.schema.get("cat_cols", [])
+
+    # 2) sanitize column-wise -> one matrix
+    with stage("predict_batch", "sanitize"):
+        X = sanitize_frame(payload.records, num_cols=num_cols, cat_cols=cat_cols)
+
+    # 3) one predict_proba for the whole batch
+    with stage("predict_batch", "predict_proba"):
+        proba = pipe.predict_proba(X)[:, 1]
+    preds = (proba >= 0.5).astype(int)
+
+    monitor = _observe_drift(bundle)
+    if monitor is not None:
+        monitor.observe_frame(X)
+
+    records = X.to_dict(orient="records")
+    shadow_scorer.submit(traffic_router.shadows_for(model_version), model_version, request_ids, records)
+
+    # 4) log to DB in one multi-row insert (store clean features!)
+    created_at = datetime.now(timezone.utc)
+    with stage("predict_batch", "db_commit"):
+        ids = bulk_insert_predictions(
+            session,
+            [
+                {
+                    "request_id": request_id,
+                    "created_at": created_at,
+                    "model_version": model_version,
+                    "features": features,
+                    "prediction": int(pred),
+                }
+                for request_id, features, pred in zip(request_ids, records, preds)
+            ],
+        )
+
+    return {
+        "model_version": model_version,
+        "n": n,
+        "results": [
+            {"prediction": int(pred), "probability": float(p), "id": row_id, "request_id": request_id}
+            for pred, p, row_id, request_id in zip(preds, proba, ids, request_ids)
+        ],
+    }
+
+
+@router.get("/log/stats")
+def log_stats(_: str = Depends(verify_api_key)):
+    scoring = {
+        "scoring_pool": scoring_pool.stats(),
+        "batcher": micro_batcher.stats(),
+        "result_cache": prediction_cache.stats() if prediction_cache is not None else None,
     }
+    writer = get_prediction_writer()
+    if writer is None:
+        return {"mode": "sync", **scoring}
+    return {"mode": "async", **writer.stats(), **scoring}
 
 
 @router.get("/latest")
@@ -72,7 +355,8 @@ def latest(
     _: str = Depends(verify_api_key),
     session: Session = Depends(get_session),
 ):
-    q = select(Prediction).order_by(Prediction.id.desc()).limit(5)
+    # created_at first: lets Postgres read only the newest partitions
+    q = select(Prediction).order_by(Prediction.created_at.desc(), Prediction.id.desc()).limit(5)
     rows = session.exec(q).all()
     return [
         {
@@ -0,0 +1,86 @@
+"""
+API tests run against a local artifact store and a SQLite database in a
+temp directory; src.* reads its settings at import time, so they are set
+here before any test module imports it.
+"""
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="churn-api-tests-")
+os.environ.update(
+    API_KEY="test-key",
+    ARTIFACT_STORE="local",
+    ARTIFACT_STORE_PATH=os.path.join(_TMP, "store"),
+    ARTIFACT_CACHE_DIR="",
+    DATABASE_URL=f"sqlite:///{os.path.join(_TMP, 'churn.db')}",
+    MODEL_WATCH="off",
+)
+
+NUM_COLS = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+CAT_COLS = ["gender", "InternetService", "Contract", "PaymentMethod"]
+CATEGORIES = {
+    "gender": ["Female", "Male"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaymentMethod": ["Electronic check", "Mailed check", "Bank transfer (automatic)", "Credit card (automatic)"],
+}
+
+
+@pytest.fixture(scope="session")
+def schema() -> Dict[str, List[str]]:
+    # metrics.json's feature lists
+    return {"num_cols": NUM_COLS, "cat_cols": CAT_COLS}
+
+
+@pytest.fixture(scope="session")
+def telco() -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Telco-shaped (X, y): the trainer's cleaned frame, numeric columns as
+    float and categoricals as str.
+    """
+    rng = np.random.default_rng(0)
+    n = 2000
+    tenure = rng.integers(0, 73, n).astype(float)
+    monthly = np.round(rng.uniform(18.25, 118.75, n), 2)
+    X = pd.DataFrame({
+        "SeniorCitizen": (rng.random(n) < 0.16).astype(float),
+        "tenure": tenure,
+        "MonthlyCharges": monthly,
+        "TotalCharges": np.round(monthly * tenure, 2),
+        **{c: np.asarray(v, dtype=object)[rng.integers(0, len(v), n)] for c, v in CATEGORIES.items()},
+    })
+    logit = -1.0 - 0.04 * tenure + 0.02 * monthly + 1.2 * (X["Contract"] == "Month-to-month")
+    y = pd.Series((rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int), name="Churn")
+    return X, y
+
+
+def _publish(pipe: Any, reference: pd.DataFrame, version: str, prefix: str = "churn_model") -> Dict[str, str]:
+    base = os.path.join(os.environ["ARTIFACT_STORE_PATH"], prefix, version)
+    os.makedirs(base, exist_ok=True)
+    joblib.dump(pipe, os.path.join(base, "model.joblib"))
+    reference.to_parquet(os.path.join(base, "reference.parquet"), index=False)
+    metrics: Dict[str, Any] = {"model_version": version, "num_cols": NUM_COLS, "cat_cols": CAT_COLS}
+    with open(os.path.join(base, "metrics.json"), "w") as f:
+        json.dump(metrics, f)
+    pointer = {"model_version": version, "prefix": prefix}
+    with open(os.path.join(os.environ["ARTIFACT_STORE_PATH"], prefix, "latest.json"), "w") as f:
+        json.dump(pointer, f)
+    return pointer
+
+
+
+@pytest.fixture
+def publish() -> Callable[..., Dict[str, str]]:
+    """
+    publish(pipe, reference, version): writes the artifact layout train.py
+    publishes (model.joblib, metrics.json, reference.parquet, latest.json)
+    into the local store.
+    """
+    return _publish
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.main import app
+from src.ml.compiled import compile_pipeline, parity_error
+from src.ml.loader import FAST_PATH_TOLERANCE, compile_scorer, model_registry
+from src.ml.predict import sanitize_features
+
+
+def _pipeline(model, schema) -> Pipeline:
+    # same layout as apps/trainer/src/train.py
+    return Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("num", Pipeline([("scaler", StandardScaler())]), schema["num_cols"]),
+            ("cat", Pipeline([("oh", OneHotEncoder(handle_unknown="ignore"))]), schema["cat_cols"]),
+        ])),
+        ("model", model),
+    ])
+
+
+@pytest.fixture(scope="module")
+def reference(telco, tmp_path_factory) -> pd.DataFrame:
+    # round-tripped through Parquet, the way the API reads reference.parquet
+    X, _ = telco
+    path = tmp_path_factory.mktemp("reference") / "reference.parquet"
+    X.sample(n=500, random_state=42).to_parquet(path, index=False)
+    return pd.read_parquet(path)
+
+
+def test_compiled_logistic_matches_sklearn(telco, reference, schema):
+    X, y = telco
+    pipe = _pipeline(LogisticRegression(max_iter=500), schema).fit(X, y)
+
+    scorer = compile_pipeline(pipe)
+    assert scorer is not None
+    assert parity_error(scorer, pipe, reference) <= FAST_PATH_TOLERANCE
+
+    # sanitized API payloads, including unseen categories and missing fields
+    rows = [
+        sanitize_features(f, num_cols=schema["num_cols"], cat_cols=schema["cat_cols"])
+        for f in ({"tenure": "12", "Contract": "Three year"}, {})
+    ]
+    assert parity_error(scorer, pipe, pd.DataFrame(rows)) <= FAST_PATH_TOLERANCE
+    assert compile_scorer(pipe, schema, reference) is not None
+
+
+def test_uncompilable_model_falls_back_to_sklearn(telco, reference, schema, publish, monkeypatch):
+    X, y = telco
+    pipe = _pipeline(RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0), schema).fit(X, y)
+    assert compile_scorer(pipe, schema, reference) is None
+
+    publish(pipe, reference, "v-forest")
+    features = reference.iloc[0].to_dict()
+    headers = {"X-API-Key": "test-key"}
+    with TestClient(app) as client:
+        bundle = model_registry.get()
+        assert bundle.model_version == "v-forest"
+        assert bundle.scorer is None
+
+        calls = []
+        predict_proba = bundle.pipeline.predict_proba
+
+        def spy(frame):
+            calls.append(len(frame))
+            return predict_proba(frame)
+
+        monkeypatch.setattr(bundle.pipeline, "predict_proba", spy)
+        r = client.post("/predict", json={"features": features}, headers=headers)
+
+    assert r.status_code == 200
+    assert calls == [1]
+    expected = predict_proba(reference.head(1))[:, 1][0]
+    assert r.json()["probability"] == pytest.approx(expected)
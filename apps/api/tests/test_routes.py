@@ -0,0 +1,15 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+@pytest.mark.parametrize("version", ["..%2Fx", "..", "a%2F..%2F..%2Fx", ".hidden"])
+def test_invalid_pinned_version_is_not_found(version):
+    with TestClient(app) as client:
+        r = client.post(f"/predict?model_version={version}", json={"features": {}}, headers=HEADERS)
+        assert r.status_code == 404
+        r = client.post(f"/predict/batch?model_version={version}", json={"records": [{}]}, headers=HEADERS)
+        assert r.status_code == 404
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+PROFILE_BINS = 10
+PROFILE_MAX_CATEGORIES = 10000
+
+
+def build_drift_profile(df: pd.DataFrame, num_cols: List[str], cat_cols: List[str], bins: int = PROFILE_BINS) -> Dict[str, Any]:
+    """
+    Reference side of the API drift check (PSI / L1), computed once per model version.
+
+    numeric:     quantile bin edges + expected proportion per bin
+                 (edges is null when the column is too small / constant to bin)
+    categorical: category -> frequency, most frequent first
+    """
+    profile: Dict[str, Any] = {
+        "bins": bins,
+        "n_reference": int(len(df)),
+        "numeric": {},
+        "categorical": {},
+    }
+
+    for c in num_cols:
+        x = df[c].to_numpy(dtype=float)
+        x = x[np.isfinite(x)]
+
+        edges = None
+        if len(x) >= 10:
+            edges = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)))
+            if len(edges) < 3:  # not enough variability
+                edges = None
+
+        if edges is None:
+            profile["numeric"][c] = {"edges": None, "expected": None}
+            continue
+
+        counts, _ = np.histogram(x, bins=edges)
+        profile["numeric"][c] = {
+            "edges": edges.tolist(),
+            "expected": (counts / max(counts.sum(), 1)).tolist(),
+        }
+
+    for c in cat_cols:
+        freqs = df[c].fillna("").astype(str).value_counts(normalize=True).head(PROFILE_MAX_CATEGORIES)
+        profile["categorical"][c] = {"freqs": {k: float(v) for k, v in freqs.items()}}
+
+    return profile
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.fingerprint import data_digest
+
+# materialized datasets, one directory per (data, feature code) key ("" = off, everything in memory)
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "/app/data/features")
+
+TARGET = "Churn"
+DROP_COLS = ["customerID"]
+# numeric, but text with blanks in the raw CSV
+NUMERIC_TEXT_COLS = ["TotalCharges"]
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+# ======================
+# Cleaning / preprocessing
+# ======================
+
+def clean_target(target: pd.Series) -> pd.Series:
+    # Target normalize
+    # Dataset bazen "Churn" -> "Yes/No", Parquet exports already 0/1
+    if not pd.api.types.is_numeric_dtype(target):
+        target = target.map({"Yes": 1, "No": 0})
+    return target.fillna(0).astype(int)
+
+
+def clean_features(frame: pd.DataFrame, num_cols: List[str], cat_cols: List[str]) -> pd.DataFrame:
+    """
+    num_cols + cat_cols of frame the way the API's sanitize_frame hands
+    them to the pipeline: numeric -> float (missing 0), categorical -> str
+    (missing ""). Columns absent from frame are all missing.
+    """
+    X = pd.DataFrame(index=frame.index)
+    for c in num_cols:
+        # TotalCharges bazen string + boş olabilir
+        X[c] = pd.to_numeric(frame[c], errors="coerce").fillna(0).astype("float64") if c in frame else 0.0
+    for c in cat_cols:
+        X[c] = frame[c].fillna("").astype(str).astype(object) if c in frame else ""
+    return X
+
+
+def clean_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Raw CSV frame -> (X, y): target mapped to 0/1, customerID dropped,
+    features cleaned by clean_features.
+    """
+    y = clean_target(df[TARGET])
+    # customerID'i drop
+    X = df.drop(columns=[TARGET] + [c for c in DROP_COLS if c in df.columns])
+    num_cols, cat_cols = split_columns(X)
+    return clean_features(X, num_cols, cat_cols), y
+
+
+def split_columns(X: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    cat_cols = [c for c in X.select_dtypes(include=["object", "category"]).columns if c not in NUMERIC_TEXT_COLS]
+    num_cols = [c for c in X.columns if c not in cat_cols]
+    return num_cols, cat_cols
+
+
+def build_preprocessor(
+    num_cols: List[str],
+    cat_cols: List[str],
+    categories: Optional[List[List[Any]]] = None,
+) -> ColumnTransformer:
+    """
+    Scaled numeric columns + one-hot categorical columns. categories fixes
+    the vocabulary per categorical column (learned from the data otherwise).
+    """
+    return ColumnTransformer(
+        transformers=[
+            ("num", Pipeline([("scaler", StandardScaler())]), num_cols),
+            ("cat", Pipeline([("oh", OneHotEncoder(handle_unknown="ignore", categories=categories or "auto"))]), cat_cols),
+        ]
+    )
+
+
+def split_indices(y: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    # same rows as train_test_split(X, y, ...) on the frame itself
+    return train_test_split(
+        np.arange(len(y)), test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+
+
+# ======================
+# Materialized feature set
+# ======================
+
+@dataclass
+class FeatureSet:
+    """
+    Cleaned dataset plus its design matrix under the preprocessor fitted
+    on the training split. matrix rows follow frame rows; it is
+    memory-mapped when it comes from the cache.
+    """
+    X: pd.DataFrame
+    y: pd.Series
+    num_cols: List[str]
+    cat_cols: List[str]
+    preprocessor: ColumnTransformer
+    matrix: Any
+    train_idx: np.ndarray
+    test_idx: np.ndarray
+    report: Dict[str, Any] = field(default_factory=dict)
+
+
+def feature_key(data_path: str) -> str:
+    """
+    sha256 of the data bytes, this module's code and the scikit-learn
+    version: anything that changes the cleaned frame or the matrix.
+    """
+    with open(__file__, "rb") as f:
+        code = hashlib.sha256(f.read()).hexdigest()
+    return hashlib.sha256(f"{data_digest(data_path)}:{code}:{sklearn.__version__}".encode("utf-8")).hexdigest()
+
+
+def _typed(X: pd.DataFrame, cat_cols: List[str]) -> pd.DataFrame:
+    # categorical columns as category dtype: small on disk, cheap to read back
+    return X.astype({c: "category" for c in cat_cols})
+
+
+def _untyped(X: pd.DataFrame, cat_cols: List[str]) -> pd.DataFrame:
+    # back to plain values, the way the API hands features to the pipeline
+    return X.astype({c: object for c in cat_cols})
+
+
+def _save_matrix(directory: str, matrix: Any) -> str:
+    # raw .npy arrays (not .npz, which is a zip and can't be memory-mapped)
+    if sp.issparse(matrix):
+        csr = sp.csr_matrix(matrix)
+        np.save(os.path.join(directory, "matrix.data.npy"), csr.data)
+        np.save(os.path.join(directory, "matrix.indices.npy"), csr.indices)
+        np.save(os.path.join(directory, "matrix.indptr.npy"), csr.indptr)
+        return "csr"
+    np.save(os.path.join(directory, "matrix.npy"), np.ascontiguousarray(matrix))
+    return "dense"
+
+
+def _load_matrix(directory: str, meta: Dict[str, Any]) -> Any:
+    if meta["format"] == "csr":
+        arrays = [np.load(os.path.join(directory, f"matrix.{p}.npy"), mmap_mode="r") for p in ("data", "indices", "indptr")]
+        return sp.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+    return np.load(os.path.join(directory, "matrix.npy"), mmap_mode="r")
+
+
+def materialize(data_path: str) -> FeatureSet:
+    """
+    Parses and cleans DATA_PATH, fits the preprocessor on the training
+    split and transforms every row.
+    """
+    start = time.perf_counter()
+    X, y = clean_frame(pd.read_csv(data_path))
+    num_cols, cat_cols = split_columns(X)
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    train_idx, test_idx = split_indices(y)
+    pre = build_preprocessor(num_cols, cat_cols)
+    pre.fit(X.iloc[train_idx])
+    matrix = pre.transform(X)
+    transform = time.perf_counter() - start
+
+    return FeatureSet(
+        X=X,
+        y=y,
+        num_cols=num_cols,
+        cat_cols=cat_cols,
+        preprocessor=pre,
+        matrix=matrix,
+        train_idx=train_idx,
+        test_idx=test_idx,
+        report={"seconds": {"parse": round(parse, 4), "transform": round(transform, 4)}},
+    )
+
+
+def write_features(directory: str, fs: FeatureSet) -> None:
+    """
+    {directory}/dataset.parquet, preprocessor.joblib, matrix*.npy, meta.json.
+    Written to a temp directory and renamed into place, so a concurrent run
+    sees a complete set or none.
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        _typed(fs.X, fs.cat_cols).assign(**{TARGET: fs.y.astype("int8")}).to_parquet(
+            os.path.join(tmp, "dataset.parquet"), index=False
+        )
+        joblib.dump(fs.preprocessor, os.path.join(tmp, "preprocessor.joblib"))
+        fmt = _save_matrix(tmp, fs.matrix)
+        meta = {
+            "format": fmt,
+            "shape": list(fs.matrix.shape),
+            "num_cols": fs.num_cols,
+            "cat_cols": fs.cat_cols,
+            "sklearn": sklearn.__version__,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        os.rename(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        # another run got there first
+        if not os.path.isdir(directory):
+            raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def read_features(directory: str) -> FeatureSet:
+    start = time.perf_counter()
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    df = pd.read_parquet(os.path.join(directory, "dataset.parquet"))
+    y = df.pop(TARGET).astype(int)
+    X = _untyped(df, meta["cat_cols"])
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pre = joblib.load(os.path.join(directory, "preprocessor.joblib"))
+    matrix = _load_matrix(directory, meta)
+    train_idx, test_idx = split_indices(y)
+    mapped = time.perf_counter() - start
+
+    return FeatureSet(
+        X=X,
+        y=y,
+        num_cols=meta["num_cols"],
+        cat_cols=meta["cat_cols"],
+        preprocessor=pre,
+        matrix=matrix,
+        train_idx=train_idx,
+        test_idx=test_idx,
+        report={"seconds": {"parse": round(parse, 4), "map": round(mapped, 4)}},
+    )
+
+
+def load_features(data_path: str, cache_dir: Optional[str] = FEATURE_CACHE_DIR) -> FeatureSet:
+    """
+    FeatureSet of data_path: read back from cache_dir when this data and
+    feature code were materialized before, built (and cached) otherwise.
+
+    report: cache hit / miss / off, the key, matrix format and shape, and
+    seconds: parse (CSV, or Parquet on a hit) and transform, or on a hit
+    map (fitted preprocessor + memory-mapped matrix).
+    """
+    start = time.perf_counter()
+    if not cache_dir:
+        fs = materialize(data_path)
+        fs.report.update(cache="off")
+    else:
+        key = feature_key(data_path)
+        directory = os.path.join(cache_dir, key)
+        if os.path.isfile(os.path.join(directory, "meta.json")):
+            fs = read_features(directory)
+            fs.report.update(cache="hit")
+        else:
+            fs = materialize(data_path)
+            began = time.perf_counter()
+            write_features(directory, fs)
+            fs.report["seconds"]["write"] = round(time.perf_counter() - began, 4)
+            fs.report.update(cache="miss")
+        fs.report.update(key=key, path=directory)
+
+    fs.report["seconds"]["total"] = round(time.perf_counter() - start, 4)
+    fs.report.update(
+        format="csr" if sp.issparse(fs.matrix) else "dense",
+        shape=list(fs.matrix.shape),
+    )
+    return fs
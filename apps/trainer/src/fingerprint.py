@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, List
+
+import numpy
+import pandas
+import sklearn
+
+_CHUNK = 1024 * 1024
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _files(path: str) -> List[str]:
+    # a Parquet dataset can be a directory of files
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if not name.startswith((".", "_"))
+        )
+    return [path]
+
+
+def data_digest(path: str) -> str:
+    """
+    sha256 over the bytes of DATA_PATH (every file, in name order, for a directory).
+    """
+    h = hashlib.sha256()
+    for file in _files(path):
+        h.update(os.path.relpath(file, path).encode("utf-8") if file != path else b"")
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def code_digest() -> str:
+    """
+    sha256 of the trainer's own sources: a change to the pipeline or the
+    search grid must not reuse a model trained by the old code.
+    """
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(_SRC_DIR)):
+        if name.endswith(".py"):
+            h.update(name.encode("utf-8"))
+            with open(os.path.join(_SRC_DIR, name), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def library_versions() -> Dict[str, str]:
+    # libraries whose upgrade can change the fitted model or its pickle
+    return {"numpy": numpy.__version__, "pandas": pandas.__version__, "sklearn": sklearn.__version__}
+
+
+def training_fingerprint(data_path: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Identity of a training run: same data bytes + same config + same code
+    + same numpy / pandas / scikit-learn -> same model. The combined
+    "fingerprint" keys the reuse index.
+    """
+    start = time.perf_counter()
+    data = data_digest(data_path)
+    config_sha = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+    code = code_digest()
+    libraries = library_versions()
+    lib = ",".join(f"{k}={v}" for k, v in sorted(libraries.items()))
+    combined = hashlib.sha256(f"{data}:{config_sha}:{code}:{lib}".encode("utf-8")).hexdigest()
+    return {
+        "fingerprint": combined,
+        "data_sha256": data,
+        "config_sha256": config_sha,
+        "code_sha256": code,
+        "libraries": libraries,
+        "config": config,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
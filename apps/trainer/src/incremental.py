@@ -0,0 +1,288 @@
+import os
+import copy
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import Pipeline
+from sqlalchemy import JSON, DateTime, bindparam, create_engine, text
+
+from src.build_reference import build_drift_profile
+from src.features import clean_features
+from src.search import logistic_penalty
+from src.upload_artifacts import read_bytes, read_json
+
+# labeled rows per fetch from the server-side cursor (memory scales with this, not the window)
+INCREMENTAL_CHUNK_ROWS = int(os.getenv("INCREMENTAL_CHUNK_ROWS", "5000"))
+# predictions older than this aren't joined (lets Postgres prune old partitions)
+INCREMENTAL_LOOKBACK_DAYS = int(os.getenv("INCREMENTAL_LOOKBACK_DAYS", "90"))
+# share of new rows held out, picked by a hash of request_id; base and updated model are scored on it
+INCREMENTAL_HOLDOUT = float(os.getenv("INCREMENTAL_HOLDOUT", "0.2"))
+# fewer new labeled rows than this -> no update
+INCREMENTAL_MIN_ROWS = int(os.getenv("INCREMENTAL_MIN_ROWS", "200"))
+# constant SGD step for the update: small, so new rows adjust the base model rather than replace it
+INCREMENTAL_ETA0 = float(os.getenv("INCREMENTAL_ETA0", "0.001"))
+# publish only if updated AUC >= base AUC - tolerance on the holdout
+INCREMENTAL_AUC_TOLERANCE = float(os.getenv("INCREMENTAL_AUC_TOLERANCE", "0.0"))
+
+MODEL_PREFIX = os.getenv("MODEL_PREFIX", "churn_model")
+
+
+def get_database_url() -> str:
+    # same settings as the API (src.db.session there)
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+
+    user = os.getenv("POSTGRES_USER")
+    password = os.getenv("POSTGRES_PASSWORD")
+    host = os.getenv("POSTGRES_HOST", "postgres")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    db = os.getenv("POSTGRES_DB")
+
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
+
+
+# ======================
+# Base version
+# ======================
+
+def load_base() -> Tuple[str, Pipeline, bytes, bytes, Dict[str, Any]]:
+    """
+    (version, pipeline, reference.parquet, drift_profile.json, metrics) of
+    the version latest.json points to. Versions published before the
+    trainer wrote drift profiles get one rebuilt from reference.parquet,
+    the way the API loader does.
+    """
+    latest = read_json(f"{MODEL_PREFIX}/latest.json")
+    if not latest or not latest.get("model_version"):
+        raise RuntimeError(f"no {MODEL_PREFIX}/latest.json to warm-start from; train a full model first")
+    version = latest["model_version"]
+    base = f"{MODEL_PREFIX}/{version}"
+
+    model = read_bytes(f"{base}/model.joblib")
+    reference = read_bytes(f"{base}/reference.parquet")
+    profile = read_bytes(f"{base}/drift_profile.json")
+    metrics = read_json(f"{base}/metrics.json")
+    if model is None or reference is None or metrics is None:
+        raise RuntimeError(f"version {version} is incomplete")
+    if profile is None:
+        ref = pd.read_parquet(BytesIO(reference))
+        profile = json.dumps(
+            build_drift_profile(ref, metrics.get("num_cols", []), metrics.get("cat_cols", []))
+        ).encode("utf-8")
+    return version, joblib.load(BytesIO(model)), reference, profile, metrics
+
+
+def _utc(ts: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def watermark_of(metrics: Dict[str, Any]) -> datetime:
+    """
+    Labels up to this time are already in the base model: its incremental
+    watermark, or its training time for a full retrain.
+    """
+    value = (metrics.get("incremental") or {}).get("watermark") or metrics["created_at_utc"]
+    return _utc(datetime.fromisoformat(value))
+
+
+def warm_model(model: Any, n_seen: int) -> SGDClassifier:
+    """
+    SGDClassifier(log_loss) that partial_fit continues from, stepping at
+    INCREMENTAL_ETA0. An SGD model is copied with its coefficients. A
+    LogisticRegression becomes the equivalent SGD model: same coefficients
+    and penalty, alpha = 1 / (C * n) for the n rows it was fit on.
+
+    (The "optimal" schedule of a fresh SGD fit starts with large steps,
+    which throws away most of what the base model learned.)
+    """
+    if isinstance(model, SGDClassifier) and model.loss == "log_loss":
+        return copy.deepcopy(model).set_params(learning_rate="constant", eta0=INCREMENTAL_ETA0)
+    if isinstance(model, LogisticRegression):
+        n = max(int(n_seen), 1)
+        sgd = SGDClassifier(
+            loss="log_loss",
+            penalty=logistic_penalty(model),
+            alpha=1.0 / (model.C * n),
+            learning_rate="constant",
+            eta0=INCREMENTAL_ETA0,
+            random_state=42,
+        )
+        # fitted state partial_fit resumes from, as if sgd had produced these coefficients
+        sgd.classes_ = model.classes_.copy()
+        sgd.coef_ = np.ascontiguousarray(model.coef_, dtype=np.float64).copy()
+        sgd.intercept_ = np.asarray(model.intercept_, dtype=np.float64).copy()
+        sgd.n_features_in_ = model.coef_.shape[1]
+        sgd.t_ = float(n)
+        return sgd
+    raise ValueError(f"can't warm-start a {type(model).__name__}; incremental mode needs a linear log-loss model")
+
+
+# ======================
+# Labeled rows
+# ======================
+
+LABELED_ROWS = text("""
+    SELECT l.request_id, l.churn, l.created_at AS labeled_at, p.features
+    FROM churn_labels l
+    JOIN predictions p
+      ON p.request_id = l.request_id
+     AND p.created_at >= :lookback
+    WHERE l.created_at > :watermark
+      AND l.created_at <= :until
+    ORDER BY l.created_at, l.id
+""").bindparams(
+    bindparam("watermark", type_=DateTime(timezone=True)),
+    bindparam("until", type_=DateTime(timezone=True)),
+    bindparam("lookback", type_=DateTime(timezone=True)),
+).columns(labeled_at=DateTime(timezone=True), features=JSON)
+
+
+def _frame(features: List[Any], num_cols: List[str], cat_cols: List[str]) -> pd.DataFrame:
+    # logged feature dicts, cleaned like the training data (and the API's sanitize_frame)
+    return clean_features(pd.DataFrame.from_records([f or {} for f in features]), num_cols, cat_cols)
+
+
+def iter_labeled(
+    engine,
+    watermark: datetime,
+    until: datetime,
+    num_cols: List[str],
+    cat_cols: List[str],
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray, np.ndarray, datetime]]:
+    """
+    Yields (X, y, holdout mask, last labeled_at) per INCREMENTAL_CHUNK_ROWS
+    rows of predictions joined to labels that arrived in (watermark, until].
+    stream_results makes psycopg2 use a named (server-side) cursor, so only
+    one chunk is in memory at a time.
+    """
+    params = {
+        "watermark": watermark,
+        "until": until,
+        "lookback": until - timedelta(days=INCREMENTAL_LOOKBACK_DAYS),
+    }
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=INCREMENTAL_CHUNK_ROWS).execute(
+            LABELED_ROWS, params
+        )
+        for rows in result.partitions(INCREMENTAL_CHUNK_ROWS):
+            request_ids, churn, labeled_at, features = zip(*rows)
+            X = _frame(list(features), num_cols, cat_cols)
+            y = np.asarray(churn, dtype=int)
+            holdout = (pd.util.hash_array(np.asarray(request_ids, dtype=object)) % 10_000) < int(INCREMENTAL_HOLDOUT * 10_000)
+            yield X, y, holdout, max(labeled_at)
+
+
+# ======================
+# Training
+# ======================
+
+def _auc(y: np.ndarray, p: np.ndarray) -> float:
+    return float(roc_auc_score(y, p)) if len(np.unique(y)) == 2 else float("nan")
+
+
+def train_incremental() -> Tuple[Optional[Tuple[Pipeline, bytes, bytes, Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Warm-started update of the latest version from labels that arrived
+    since it was trained.
+
+    The fitted preprocessing (scaler, one-hot vocabularies) is kept, the
+    model continues with SGD partial_fit over the new training rows, one
+    chunk at a time. Base and updated model are scored on the same holdout
+    of new rows; the update is returned only if its AUC doesn't regress.
+
+    Returns ((pipeline, reference, drift profile, metrics) or None, report).
+    reference.parquet / drift_profile.json are the base version's bytes.
+    """
+    start_all = time.perf_counter()
+    version, base_pipe, reference, profile, base_metrics = load_base()
+    num_cols, cat_cols = base_metrics["num_cols"], base_metrics["cat_cols"]
+    pre = base_pipe.named_steps["preprocess"]
+    # train.py fits on 80% of n_rows
+    model = warm_model(base_pipe.named_steps["model"], int(base_metrics.get("n_rows", 0) * 0.8))
+
+    watermark = watermark_of(base_metrics)
+    until = datetime.now(timezone.utc)
+    engine = create_engine(get_database_url(), pool_pre_ping=True)
+
+    timings = {"read": 0.0, "fit": 0.0}
+    n_train = n_chunks = 0
+    last = watermark
+    hold_y, hold_X = [], []
+    try:
+        rows = iter_labeled(engine, watermark, until, num_cols, cat_cols)
+        while True:
+            began = time.perf_counter()
+            chunk = next(rows, None)
+            timings["read"] += time.perf_counter() - began
+            if chunk is None:
+                break
+            X, y, holdout, labeled_at = chunk
+            n_chunks += 1
+            last = max(last, _utc(labeled_at))
+
+            began = time.perf_counter()
+            Xt = pre.transform(X)
+            if holdout.any():
+                hold_X.append(Xt[holdout])
+                hold_y.append(y[holdout])
+            if not holdout.all():
+                model.partial_fit(Xt[~holdout], y[~holdout], classes=np.array([0, 1]))
+                n_train += int((~holdout).sum())
+            timings["fit"] += time.perf_counter() - began
+    finally:
+        engine.dispose()
+
+    # holdout: base vs update on the same rows
+    began = time.perf_counter()
+    y_hold = np.concatenate(hold_y) if hold_y else np.zeros(0, dtype=int)
+    if hold_X:
+        Xh = sp.vstack(hold_X).tocsr() if sp.issparse(hold_X[0]) else np.vstack(hold_X)
+        base_auc = _auc(y_hold, base_pipe.named_steps["model"].predict_proba(Xh)[:, 1])
+        auc = _auc(y_hold, model.predict_proba(Xh)[:, 1])
+    else:
+        base_auc = auc = float("nan")
+    timings["evaluate"] = time.perf_counter() - began
+
+    report = {
+        "base_version": version,
+        "since": watermark.isoformat(),
+        "watermark": last.isoformat(),
+        "n_train": n_train,
+        "n_holdout": int(len(y_hold)),
+        "chunks": n_chunks,
+        "base_auc": base_auc,
+        "auc": auc,
+        "seconds": {k: round(v, 4) for k, v in {**timings, "total": time.perf_counter() - start_all}.items()},
+    }
+    if n_train + len(y_hold) < INCREMENTAL_MIN_ROWS:
+        report["skipped"] = f"{n_train + len(y_hold)} new labeled rows (INCREMENTAL_MIN_ROWS={INCREMENTAL_MIN_ROWS})"
+        return None, report
+    if np.isnan(auc) or np.isnan(base_auc):
+        report["skipped"] = "holdout needs both classes"
+        return None, report
+    if auc < base_auc - INCREMENTAL_AUC_TOLERANCE:
+        report["skipped"] = f"holdout AUC regressed: {auc:.4f} < {base_auc:.4f}"
+        return None, report
+
+    pipe = Pipeline([("preprocess", pre), ("model", model)])
+    metrics = {
+        "roc_auc": auc,
+        "n_rows": int(base_metrics.get("n_rows", 0)) + n_train + int(len(y_hold)),
+        "n_features": base_metrics.get("n_features", len(num_cols) + len(cat_cols)),
+        "cat_cols": cat_cols,
+        "num_cols": num_cols,
+        "incremental": report,
+    }
+    return (pipe, reference, profile, metrics), report
+
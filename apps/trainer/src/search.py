@@ -0,0 +1,164 @@
+import os
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import HalvingGridSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+# worker processes for the search (-1: every core)
+SEARCH_N_JOBS = int(os.getenv("SEARCH_N_JOBS", "-1"))
+SEARCH_CV_FOLDS = int(os.getenv("SEARCH_CV_FOLDS", "3"))
+# successive halving: each round keeps the best 1/factor of the candidates on factor x the rows
+SEARCH_FACTOR = int(os.getenv("SEARCH_FACTOR", "3"))
+SEARCH_MIN_ROWS = int(os.getenv("SEARCH_MIN_ROWS", "500"))
+
+# scikit-learn >= 1.8 deprecates penalty= in favour of l1_ratio (0 = l2, 1 = l1)
+_L1_RATIO_API = LogisticRegression().penalty == "deprecated"
+
+
+def search_config() -> Dict[str, Any]:
+    # settings that change the search result (n_jobs doesn't)
+    return {"cv_folds": SEARCH_CV_FOLDS, "factor": SEARCH_FACTOR, "min_rows": SEARCH_MIN_ROWS}
+
+
+def l1_logistic(**params: Any) -> LogisticRegression:
+    # liblinear L1, spelled the way the installed scikit-learn expects
+    if _L1_RATIO_API:
+        return LogisticRegression(l1_ratio=1.0, solver="liblinear", **params)
+    return LogisticRegression(penalty="l1", solver="liblinear", **params)
+
+
+def logistic_penalty(model: LogisticRegression) -> str:
+    """
+    "l1" or "l2" of a LogisticRegression under either parameter style.
+    """
+    if model.penalty == "l1":
+        return "l1"
+    if model.penalty in ("deprecated", "elasticnet") and model.l1_ratio == 1:
+        return "l1"
+    return "l2"
+
+
+def param_grid() -> List[Dict[str, Any]]:
+    """
+    Model families and regularization settings; the "model" step of the
+    pipeline is swapped per family.
+    """
+    return [
+        {
+            "model": [LogisticRegression(max_iter=1000)],
+            "model__C": [0.01, 0.1, 1.0, 10.0],
+        },
+        {
+            "model": [l1_logistic(max_iter=1000)],
+            "model__C": [0.1, 1.0],
+        },
+        {
+            "model": [SGDClassifier(loss="log_loss", random_state=42)],
+            "model__alpha": [1e-5, 1e-4, 1e-3],
+        },
+        {
+            "model": [RandomForestClassifier(n_estimators=200, n_jobs=1, random_state=42)],
+            "model__max_depth": [8, None],
+            "model__min_samples_leaf": [1, 5],
+        },
+    ]
+
+
+def _describe(params: Dict[str, Any]) -> Dict[str, Any]:
+    out = {"model": type(params["model"]).__name__}
+    for k, v in params.items():
+        if k != "model":
+            out[k.replace("model__", "")] = v
+    if isinstance(params["model"], LogisticRegression):
+        out.setdefault("penalty", logistic_penalty(params["model"]))
+    return out
+
+
+def candidate_report(search: HalvingGridSearchCV, n_splits: int) -> List[Dict[str, Any]]:
+    """
+    One entry per candidate: how far it got, its last CV score and the
+    wall-clock spent on it across rounds (fit + score, all folds).
+    """
+    res = search.cv_results_
+    by_candidate: Dict[str, Dict[str, Any]] = {}
+    for i, params in enumerate(res["params"]):
+        desc = _describe(params)
+        key = json.dumps(desc, sort_keys=True, default=str)
+        entry = by_candidate.setdefault(key, {**desc, "rounds": 0, "seconds": 0.0})
+        entry["rounds"] += 1
+        entry["n_rows"] = int(res["n_resources"][i])
+        score = res["mean_test_score"][i]
+        entry["cv_roc_auc"] = None if np.isnan(score) else float(score)
+        entry["seconds"] += float((res["mean_fit_time"][i] + res["mean_score_time"][i]) * n_splits)
+
+    rounds = int(search.n_iterations_)
+    out = []
+    for entry in by_candidate.values():
+        entry["seconds"] = round(entry["seconds"], 4)
+        entry["stopped_early"] = entry["rounds"] < rounds
+        out.append(entry)
+    return sorted(out, key=lambda e: (-(e["rounds"]), -(e["cv_roc_auc"] or 0.0)))
+
+
+def search_pipeline(pre: ColumnTransformer, Xt: Any, y: pd.Series) -> Tuple[Pipeline, Dict[str, Any]]:
+    """
+    Cross-validated successive-halving search over param_grid() on a process
+    pool. Candidates start on SEARCH_MIN_ROWS rows; only the best 1/factor
+    of each round go on with more data, so hopeless ones stop early.
+
+    pre is already fitted on the training split and Xt is its output (the
+    materialized matrix of src.features), so candidates only fit models.
+    The CV folds therefore share the scaler statistics of the whole
+    training split instead of refitting them per fold; StandardScaler and
+    OneHotEncoder leak little across folds, and the test-split AUC is
+    unaffected.
+
+    Returns pre followed by the best model refit on all of Xt (ready to
+    publish) and the search summary for metrics.json.
+    """
+    pipe = Pipeline([("model", LogisticRegression(max_iter=1000))])
+    cv = StratifiedKFold(n_splits=SEARCH_CV_FOLDS, shuffle=True, random_state=42)
+
+    search = HalvingGridSearchCV(
+        pipe,
+        param_grid(),
+        scoring="roc_auc",
+        cv=cv,
+        factor=SEARCH_FACTOR,
+        resource="n_samples",
+        min_resources=min(SEARCH_MIN_ROWS, Xt.shape[0]),
+        n_jobs=SEARCH_N_JOBS,
+        refit=True,
+        error_score=np.nan,
+        random_state=42,
+    )
+
+    start = time.perf_counter()
+    search.fit(Xt, y)
+    seconds = time.perf_counter() - start
+
+    best = Pipeline([("preprocess", pre), ("model", search.best_estimator_.named_steps["model"])])
+
+    summary = {
+        "strategy": "successive_halving",
+        "scoring": "roc_auc",
+        "cv_folds": SEARCH_CV_FOLDS,
+        "factor": SEARCH_FACTOR,
+        "n_jobs": SEARCH_N_JOBS,
+        "preprocessing": "fitted_on_train_split",
+        "n_candidates": int(search.n_candidates_[0]),
+        "rounds": int(search.n_iterations_),
+        "seconds": round(seconds, 4),
+        "refit_seconds": round(float(search.refit_time_), 4),
+        "best": {**_describe(search.best_params_), "cv_roc_auc": float(search.best_score_)},
+        "candidates": candidate_report(search, SEARCH_CV_FOLDS),
+    }
+    return best, summary
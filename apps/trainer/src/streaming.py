@@ -0,0 +1,215 @@
+import os
+import time
+import resource
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.build_reference import build_drift_profile
+from src.features import DROP_COLS, NUMERIC_TEXT_COLS, TARGET, build_preprocessor, clean_features, clean_target
+
+# rows per chunk read from DATA_PATH (peak memory scales with this, not the file;
+# Parquet is read a row group at a time at most, so write it with row groups of this order)
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "100000"))
+# passes of partial_fit over the training stream
+STREAM_EPOCHS = int(os.getenv("STREAM_EPOCHS", "3"))
+# share of rows held out for the AUC, picked by a hash of the row number (same rows every pass)
+STREAM_HOLDOUT = float(os.getenv("STREAM_HOLDOUT", "0.2"))
+STREAM_ALPHA = float(os.getenv("STREAM_ALPHA", "1e-3"))
+# uniform sample of training rows kept for reference.parquet and the drift profile quantiles
+STREAM_SAMPLE_ROWS = int(os.getenv("STREAM_SAMPLE_ROWS", "100000"))
+
+
+def stream_config() -> Dict[str, Any]:
+    return {
+        "chunk_rows": STREAM_CHUNK_ROWS,
+        "epochs": STREAM_EPOCHS,
+        "holdout": STREAM_HOLDOUT,
+        "alpha": STREAM_ALPHA,
+        "sample_rows": STREAM_SAMPLE_ROWS,
+    }
+
+
+# ======================
+# Reading
+# ======================
+
+def _is_parquet(path: str) -> bool:
+    return os.path.isdir(path) or path.endswith((".parquet", ".pq"))
+
+
+def discover_columns(path: str) -> Tuple[List[str], List[str], Dict[str, Any]]:
+    """
+    (num_cols, cat_cols, CSV read dtypes) from the file's head / schema.
+
+    Same split as src.features.split_columns: numeric columns plus
+    TotalCharges (text with blanks in the raw CSV, read as strings and
+    coerced per chunk) are numeric, everything else is categorical.
+    """
+    if _is_parquet(path):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        schema = ds.dataset(path, format="parquet").schema
+        names = schema.names
+        raw_numeric = {f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)}
+    else:
+        head = pd.read_csv(path, nrows=1000)
+        names = head.columns.tolist()
+        raw_numeric = set(head.select_dtypes(include=["number"]).columns)
+
+    features = [c for c in names if c != TARGET and c not in DROP_COLS]
+    num_cols = [c for c in features if c in raw_numeric or c in NUMERIC_TEXT_COLS]
+    cat_cols = [c for c in features if c not in num_cols]
+    dtypes: Dict[str, Any] = {c: ("float64" if c in raw_numeric else str) for c in features}
+    dtypes[TARGET] = str
+    return num_cols, cat_cols, dtypes
+
+
+def iter_chunks(
+    path: str,
+    num_cols: List[str],
+    cat_cols: List[str],
+    dtypes: Dict[str, Any],
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+    """
+    Yields (X, y, holdout mask) per chunk, cleaned the way single mode
+    cleans the full frame (src.features.clean_target / clean_features).
+    """
+    columns = num_cols + cat_cols + [TARGET]
+    if _is_parquet(path):
+        import pyarrow.dataset as ds
+
+        batches = ds.dataset(path, format="parquet").to_batches(columns=columns, batch_size=STREAM_CHUNK_ROWS)
+        frames = (b.to_pandas() for b in batches)
+    else:
+        frames = pd.read_csv(path, usecols=columns, dtype={c: dtypes[c] for c in columns}, chunksize=STREAM_CHUNK_ROWS)
+
+    offset = 0
+    for frame in frames:
+        n = len(frame)
+        X = clean_features(frame, num_cols, cat_cols)
+        y = clean_target(frame[TARGET]).to_numpy()
+
+        rows = np.arange(offset, offset + n, dtype=np.uint64)
+        holdout = (pd.util.hash_array(rows) % 10_000) < int(STREAM_HOLDOUT * 10_000)
+        offset += n
+        yield X.reset_index(drop=True), y, holdout
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ======================
+# Training
+# ======================
+
+def train_streaming(path: str) -> Tuple[Pipeline, pd.DataFrame, Dict[str, Any], Dict[str, Any]]:
+    """
+    Out-of-core version of train.py's fit, for data larger than memory.
+
+    pass 1:   scaler statistics (StandardScaler.partial_fit), category
+              vocabularies, a bounded uniform sample of training rows
+    pass 2+:  SGDClassifier(log_loss).partial_fit per chunk, STREAM_EPOCHS times
+    last:     holdout stream -> ROC AUC
+
+    Returns (pipeline, reference, drift profile, metrics) in the shapes
+    train.py publishes: the same ColumnTransformer layout, with a linear
+    model the API can still compile. Drift quantiles come from the sample.
+    """
+    timings: Dict[str, float] = {}
+    rng = np.random.default_rng(42)
+    num_cols, cat_cols, dtypes = discover_columns(path)
+
+    # pass 1: statistics
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    vocab: Dict[str, set] = {c: set() for c in cat_cols}
+    sample: Optional[pd.DataFrame] = None
+    n_rows = n_train = n_chunks = 0
+    for X, y, holdout in iter_chunks(path, num_cols, cat_cols, dtypes):
+        n_chunks += 1
+        n_rows += len(X)
+        train = X[~holdout]
+        n_train += len(train)
+        if train.empty:
+            continue
+        if num_cols:
+            scaler.partial_fit(train[num_cols])
+        for c in cat_cols:
+            vocab[c].update(train[c].unique())
+        # bottom-k on random keys keeps a uniform sample of at most STREAM_SAMPLE_ROWS rows
+        keyed = train.assign(_key=rng.random(len(train)))
+        sample = keyed if sample is None else pd.concat([sample, keyed], ignore_index=True)
+        if len(sample) > STREAM_SAMPLE_ROWS:
+            sample = sample.nsmallest(STREAM_SAMPLE_ROWS, "_key").reset_index(drop=True)
+    timings["stats"] = time.perf_counter() - start
+    if sample is None:
+        raise ValueError(f"no training rows in {path}")
+    sample = sample.drop(columns=["_key"])
+
+    # preprocessing fitted from the streamed statistics
+    categories = [sorted(vocab[c]) for c in cat_cols]
+    pre = build_preprocessor(num_cols, cat_cols, categories=categories)
+    pre.fit(sample)
+    if num_cols:
+        fitted = pre.named_transformers_["num"].named_steps["scaler"]
+        for attr in ("mean_", "var_", "scale_", "n_samples_seen_"):
+            setattr(fitted, attr, getattr(scaler, attr))
+
+    # passes 2+: incremental fit
+    model = SGDClassifier(loss="log_loss", alpha=STREAM_ALPHA, random_state=42)
+    epoch_seconds = []
+    for _ in range(STREAM_EPOCHS):
+        start = time.perf_counter()
+        for X, y, holdout in iter_chunks(path, num_cols, cat_cols, dtypes):
+            if holdout.all():
+                continue
+            order = rng.permutation(int((~holdout).sum()))
+            Xt = pre.transform(X[~holdout])[order]
+            model.partial_fit(Xt, y[~holdout][order], classes=np.array([0, 1]))
+        epoch_seconds.append(round(time.perf_counter() - start, 4))
+    timings["fit"] = float(sum(epoch_seconds))
+
+    # holdout evaluation
+    start = time.perf_counter()
+    ys, ps = [], []
+    for X, y, holdout in iter_chunks(path, num_cols, cat_cols, dtypes):
+        if holdout.any():
+            ys.append(y[holdout])
+            ps.append(model.predict_proba(pre.transform(X[holdout]))[:, 1])
+    y_hold = np.concatenate(ys) if ys else np.zeros(0, dtype=int)
+    auc = float(roc_auc_score(y_hold, np.concatenate(ps))) if len(np.unique(y_hold)) == 2 else float("nan")
+    timings["evaluate"] = time.perf_counter() - start
+
+    pipe = Pipeline([("preprocess", pre), ("model", model)])
+    reference = sample.sample(n=min(500, len(sample)), random_state=42).reset_index(drop=True)
+    profile = build_drift_profile(sample, num_cols, cat_cols)
+
+    metrics = {
+        "roc_auc": auc,
+        "n_rows": int(n_rows),
+        "n_features": len(num_cols) + len(cat_cols),
+        "cat_cols": cat_cols,
+        "num_cols": num_cols,
+        "stream": {
+            "format": "parquet" if _is_parquet(path) else "csv",
+            "chunk_rows": STREAM_CHUNK_ROWS,
+            "chunks": n_chunks,
+            "n_train": int(n_train),
+            "n_holdout": int(len(y_hold)),
+            "epochs": STREAM_EPOCHS,
+            "epoch_seconds": epoch_seconds,
+            "sample_rows": int(len(sample)),
+            "seconds": {k: round(v, 4) for k, v in timings.items()},
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        },
+    }
+    return pipe, reference, profile, metrics
@@ -1,90 +1,154 @@
 import os
 import json
+import time
 import joblib
-import boto3
-import pandas as pd
 from io import BytesIO
 from datetime import datetime, timezone
-from sklearn.model_selection import train_test_split
-from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score
 
-DATA_PATH = os.getenv("DATA_PATH", "/app/data/raw/telco_churn.csv")
+from src.build_reference import build_drift_profile
+from src.features import load_features
+from src.fingerprint import training_fingerprint
+from src.incremental import train_incremental
+from src.search import search_config, search_pipeline
+from src.streaming import stream_config, train_streaming
+from src.upload_artifacts import (
+    artifact_uri,
+    manifest_artifact,
+    read_bytes,
+    read_json,
+    unchanged_artifacts,
+    upload_artifacts,
+    upload_bytes,
+)
 
-MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://minio:9000")
-MINIO_BUCKET = os.getenv("MINIO_BUCKET", "mlops-artifacts")
-MINIO_ACCESS_KEY = os.getenv("MINIO_ROOT_USER")
-MINIO_SECRET_KEY = os.getenv("MINIO_ROOT_PASSWORD")
+DATA_PATH = os.getenv("DATA_PATH", "/app/data/raw/telco_churn.csv")
 
 MODEL_PREFIX = os.getenv("MODEL_PREFIX", "churn_model")
 MODEL_VERSION = os.getenv("MODEL_VERSION") or datetime.now(timezone.utc).strftime("v%Y%m%d-%H%M%S")
 
+# single: the fixed LogisticRegression | search: model-family / regularization search, see src.search
+# stream: out-of-core SGD over DATA_PATH (CSV or Parquet) in chunks, see src.streaming
+# incremental: warm-start the latest version on newly labeled predictions, see src.incremental
+TRAIN_MODE = os.getenv("TRAIN_MODE", "single")
+
+# 1: when DATA_PATH, the training config and the trainer code match an already
+# published version (fingerprints/{sha}.json), repoint latest.json to it instead of retraining.
+# An explicit MODEL_VERSION always trains and publishes under that name.
+TRAIN_REUSE = os.getenv("TRAIN_REUSE", "1") == "1" and not os.getenv("MODEL_VERSION")
+
+
+def train_in_memory():
+    # cleaned frame + design matrix, materialized once per data / feature code (src.features)
+    features = load_features(DATA_PATH)
+    X, y = features.X, features.y
+    num_cols, cat_cols = features.num_cols, features.cat_cols
+    pre = features.preprocessor
+
+    X_train, y_train = X.iloc[features.train_idx], y.iloc[features.train_idx]
+    y_test = y.iloc[features.test_idx]
+    Xt_train, Xt_test = features.matrix[features.train_idx], features.matrix[features.test_idx]
+
+    search = None
+    if TRAIN_MODE == "search":
+        pipe, search = search_pipeline(pre, Xt_train, y_train)
+    else:
+        model = LogisticRegression(max_iter=500)
+        model.fit(Xt_train, y_train)
+
+        pipe = Pipeline([
+            ("preprocess", pre),
+            ("model", model),
+        ])
+
+    proba = pipe.named_steps["model"].predict_proba(Xt_test)[:, 1]
+    auc = float(roc_auc_score(y_test, proba))
 
-def s3_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=MINIO_ENDPOINT,
-        aws_access_key_id=MINIO_ACCESS_KEY,
-        aws_secret_access_key=MINIO_SECRET_KEY,
-        region_name="us-east-1",
-    )
+    # reference dataset: train'in bir kısmını sakla (drift için)
+    reference = X_train.sample(n=min(500, len(X_train)), random_state=42).copy()
 
+    # drift profile: bin edges / expected proportions from the full training split
+    profile = build_drift_profile(X_train, num_cols, cat_cols)
 
-def upload_bytes(key: str, content: bytes, content_type: str = "application/octet-stream"):
-    s3 = s3_client()
-    s3.put_object(Bucket=MINIO_BUCKET, Key=key, Body=content, ContentType=content_type)
+    metrics = {
+        "roc_auc": auc,
+        "n_rows": int(len(X)),
+        "n_features": int(X.shape[1]),
+        "cat_cols": cat_cols,
+        "num_cols": num_cols,
+        "features": features.report,
+    }
+    if search is not None:
+        metrics["search"] = search
+    return pipe, reference, profile, metrics
+
+
+def training_config():
+    """
+    Everything besides the data and the code that changes the trained model.
+    """
+    config = {"train_mode": TRAIN_MODE}
+    if TRAIN_MODE == "search":
+        config["search"] = search_config()
+    elif TRAIN_MODE == "stream":
+        config["stream"] = stream_config()
+    return config
+
+
+def reuse_version(fp):
+    """
+    Version published from the same fingerprint, if it is still complete.
+    """
+    index = read_json(f"{MODEL_PREFIX}/fingerprints/{fp['fingerprint']}.json")
+    if not index:
+        return None
+    version = index.get("model_version")
+    if not version or read_bytes(f"{MODEL_PREFIX}/{version}/manifest.json") is None:
+        return None
+    return version
 
 
 def main():
-    df = pd.read_csv(DATA_PATH)
-
-    # Target normalize
-    # Dataset bazen "Churn" -> "Yes/No"
-    df["Churn"] = df["Churn"].map({"Yes": 1, "No": 0})
-
-    # TotalCharges bazen string + boş olabilir
-    if "TotalCharges" in df.columns:
-        df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce")
-        df["TotalCharges"] = df["TotalCharges"].fillna(0)
-
-    # customerID'i drop
-    if "customerID" in df.columns:
-        df = df.drop(columns=["customerID"])
-
-    y = df["Churn"].astype(int)
-    X = df.drop(columns=["Churn"])
-
-    cat_cols = X.select_dtypes(include=["object"]).columns.tolist()
-    num_cols = [c for c in X.columns if c not in cat_cols]
-
-    pre = ColumnTransformer(
-        transformers=[
-            ("num", Pipeline([("scaler", StandardScaler())]), num_cols),
-            ("cat", Pipeline([("oh", OneHotEncoder(handle_unknown="ignore"))]), cat_cols),
-        ]
-    )
-
-    model = LogisticRegression(max_iter=500)
-
-    pipe = Pipeline([
-        ("preprocess", pre),
-        ("model", model),
-    ])
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-
-    pipe.fit(X_train, y_train)
-
-    proba = pipe.predict_proba(X_test)[:, 1]
-    auc = float(roc_auc_score(y_test, proba))
-
-    # reference dataset: train'in bir kısmını sakla (drift için)
-    reference = X_train.sample(n=min(500, len(X_train)), random_state=42).copy()
+    previous = read_json(f"{MODEL_PREFIX}/latest.json")
+
+    # incremental: warm-started update from labeled predictions in Postgres (src.incremental);
+    # its data isn't DATA_PATH, so it has no fingerprint to reuse
+    fp = None
+    if TRAIN_MODE == "incremental":
+        result, report = train_incremental()
+        if result is None:
+            print("✅ Incremental update skipped:", report["skipped"])
+            print("Model version:", report["base_version"], "(unchanged)")
+            print(f"Holdout AUC: base {report['base_auc']:.4f}, updated {report['auc']:.4f} ({report['n_holdout']} rows)")
+            return
+        pipe, reference_bytes, profile_bytes, metrics = result
+    else:
+        fp = training_fingerprint(DATA_PATH, training_config())
+        if TRAIN_REUSE:
+            version = reuse_version(fp)
+            if version is not None:
+                if not previous or previous.get("model_version") != version:
+                    latest = {"model_version": version, "prefix": MODEL_PREFIX}
+                    upload_bytes(f"{MODEL_PREFIX}/latest.json", json.dumps(latest).encode("utf-8"), "application/json")
+                print("✅ Training skipped: data, config, code and libraries unchanged")
+                print("Model version:", version)
+                print("Fingerprint:", fp["fingerprint"], f"({fp['seconds']:.3f}s)")
+                print("Serving:", artifact_uri(f"{MODEL_PREFIX}/{version}") + "/")
+                return
+
+        # stream: chunked out-of-core fit (src.streaming), otherwise the whole CSV in memory
+        if TRAIN_MODE == "stream":
+            pipe, reference, profile, metrics = train_streaming(DATA_PATH)
+        else:
+            pipe, reference, profile, metrics = train_in_memory()
+
+        # reference parquet
+        ref_buf = BytesIO()
+        reference.to_parquet(ref_buf, index=False)
+        reference_bytes = ref_buf.getvalue()
+        profile_bytes = json.dumps(profile).encode("utf-8")
 
     # artifacts
     model_bytes = BytesIO()
@@ -92,34 +156,69 @@ def main():
     model_bytes.seek(0)
 
     metrics = {
-        "roc_auc": auc,
+        "roc_auc": metrics.pop("roc_auc"),
         "model_version": MODEL_VERSION,
         "created_at_utc": datetime.now(timezone.utc).isoformat(),
-        "n_rows": int(len(df)),
-        "n_features": int(X.shape[1]),
-        "cat_cols": cat_cols,
-        "num_cols": num_cols,
+        **metrics,
+        "train_mode": TRAIN_MODE,
+        "model": type(pipe.named_steps["model"]).__name__,
     }
+    if fp is not None:
+        metrics["fingerprint"] = fp
 
-    # Upload paths
+    # Upload paths (concurrently), with a manifest of their checksums
     base = f"{MODEL_PREFIX}/{MODEL_VERSION}"
-    upload_bytes(f"{base}/model.joblib", model_bytes.read(), "application/octet-stream")
-    upload_bytes(f"{base}/metrics.json", json.dumps(metrics, indent=2).encode("utf-8"), "application/json")
-
-    # reference parquet
-    ref_buf = BytesIO()
-    reference.to_parquet(ref_buf, index=False)
-    ref_buf.seek(0)
-    upload_bytes(f"{base}/reference.parquet", ref_buf.read(), "application/octet-stream")
+    artifacts = {
+        f"{base}/model.joblib": (model_bytes.read(), "application/octet-stream"),
+        f"{base}/metrics.json": (json.dumps(metrics, indent=2).encode("utf-8"), "application/json"),
+        f"{base}/reference.parquet": (reference_bytes, "application/octet-stream"),
+        f"{base}/drift_profile.json": (profile_bytes, "application/json"),
+    }
 
-    # Also upload a pointer to "latest"
+    # artifacts identical to the current version's are copied inside the store, not re-uploaded
+    copies = {}
+    if previous and previous.get("model_version") and previous["model_version"] != MODEL_VERSION:
+        previous_base = f"{MODEL_PREFIX}/{previous['model_version']}"
+        copies = unchanged_artifacts(base, artifacts, previous_base, read_json(f"{previous_base}/manifest.json"))
+
+    manifest_key, manifest = manifest_artifact(base, artifacts)
+    artifacts[manifest_key] = manifest
+    start = time.perf_counter()
+    timings = upload_artifacts(artifacts, copies)
+    upload_seconds = time.perf_counter() - start
+
+    # fingerprint -> version index, then the pointer to "latest" (last, once every artifact is in place)
+    if fp is not None:
+        index = {"model_version": MODEL_VERSION, "fingerprint": fp["fingerprint"]}
+        upload_bytes(f"{MODEL_PREFIX}/fingerprints/{fp['fingerprint']}.json", json.dumps(index).encode("utf-8"), "application/json")
     latest = {"model_version": MODEL_VERSION, "prefix": MODEL_PREFIX}
     upload_bytes(f"{MODEL_PREFIX}/latest.json", json.dumps(latest).encode("utf-8"), "application/json")
 
     print("✅ Training finished")
     print("Model version:", MODEL_VERSION)
-    print("AUC:", auc)
-    print("Uploaded to:", f"s3://{MINIO_BUCKET}/{base}/")
+    print("AUC:", metrics["roc_auc"])
+    search = metrics.get("search")
+    if search is not None:
+        best = search["best"]
+        print(f"Search: {search['n_candidates']} candidates, {search['rounds']} rounds, {search['seconds']:.1f}s; best {best}")
+    features = metrics.get("features")
+    if features is not None:
+        print(f"Features: cache {features['cache']}, {features['format']} {features['shape']}, {features['seconds']}")
+    stream = metrics.get("stream")
+    if stream is not None:
+        print(f"Stream: {stream['chunks']} chunks x {stream['epochs']} epochs, {stream['seconds']}, peak RSS {stream['peak_rss_mb']} MB")
+    incremental = metrics.get("incremental")
+    if incremental is not None:
+        print(
+            f"Incremental: from {incremental['base_version']}, {incremental['n_train']} new rows in {incremental['chunks']} chunks, "
+            f"holdout AUC {incremental['base_auc']:.4f} -> {incremental['auc']:.4f}, {incremental['seconds']}"
+        )
+    if fp is not None:
+        print("Fingerprint:", fp["fingerprint"], f"({fp['seconds']:.3f}s)")
+    print("Uploaded to:", artifact_uri(base) + "/", f"({upload_seconds:.3f}s)")
+    for key, secs in timings.items():
+        how = "copied" if key in copies else "uploaded"
+        print(f"  {key.rsplit('/', 1)[-1]}: {how} {secs:.3f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# s3 (MinIO) | local (directory shared with the API, same {prefix}/{version}/... layout)
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "s3")
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH", "/artifacts")
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://minio:9000")
+MINIO_BUCKET = os.getenv("MINIO_BUCKET", "mlops-artifacts")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ROOT_USER")
+MINIO_SECRET_KEY = os.getenv("MINIO_ROOT_PASSWORD")
+
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "5"))
+S3_RETRY_MODE = os.getenv("S3_RETRY_MODE", "standard")
+
+# artifacts are uploaded concurrently; objects above the threshold
+# (model.joblib) go up as a parallel multipart upload
+ARTIFACT_UPLOAD_WORKERS = int(os.getenv("ARTIFACT_UPLOAD_WORKERS", "4"))
+MULTIPART_THRESHOLD_MB = int(os.getenv("MULTIPART_THRESHOLD_MB", "16"))
+MULTIPART_CHUNK_MB = int(os.getenv("MULTIPART_CHUNK_MB", "8"))
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD_MB * 1024 * 1024,
+    multipart_chunksize=MULTIPART_CHUNK_MB * 1024 * 1024,
+    max_concurrency=ARTIFACT_UPLOAD_WORKERS,
+)
+
+_s3 = None
+_s3_lock = threading.Lock()
+
+
+def s3_client():
+    """
+    Process-wide S3 client with a connection pool sized for concurrent uploads.
+    """
+    global _s3
+    if _s3 is None:
+        with _s3_lock:
+            if _s3 is None:
+                _s3 = boto3.client(
+                    "s3",
+                    endpoint_url=MINIO_ENDPOINT,
+                    aws_access_key_id=MINIO_ACCESS_KEY,
+                    aws_secret_access_key=MINIO_SECRET_KEY,
+                    region_name="us-east-1",
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": S3_RETRY_MODE},
+                    ),
+                )
+    return _s3
+
+
+def local_path(key: str) -> str:
+    parts = [p for p in key.split("/") if p]
+    if not parts or any(p in (".", "..") for p in parts):
+        raise ValueError(f"invalid artifact key: {key!r}")
+    return os.path.join(ARTIFACT_STORE_PATH, *parts)
+
+
+def write_local(key: str, content: bytes):
+    """
+    Writes to a temp file next to the target and renames it into place, so
+    readers (the API polling latest.json) never see a partial file.
+    """
+    target = local_path(key)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def artifact_uri(key: str) -> str:
+    if ARTIFACT_STORE == "local":
+        return f"file://{local_path(key)}"
+    return f"s3://{MINIO_BUCKET}/{key}"
+
+
+def upload_bytes(key: str, content: bytes, content_type: str = "application/octet-stream"):
+    if ARTIFACT_STORE == "local":
+        write_local(key, content)
+        return
+    if ARTIFACT_STORE != "s3":
+        raise ValueError(f"ARTIFACT_STORE must be s3 or local, got {ARTIFACT_STORE!r}")
+    s3_client().upload_fileobj(
+        BytesIO(content),
+        MINIO_BUCKET,
+        key,
+        ExtraArgs={"ContentType": content_type},
+        Config=TRANSFER_CONFIG,
+    )
+
+
+def read_bytes(key: str) -> Optional[bytes]:
+    """
+    Content of key, None if it doesn't exist.
+    """
+    if ARTIFACT_STORE == "local":
+        try:
+            with open(local_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    try:
+        return s3_client().get_object(Bucket=MINIO_BUCKET, Key=key)["Body"].read()
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def read_json(key: str) -> Optional[dict]:
+    """
+    Parsed JSON content of key, None if it doesn't exist.
+    """
+    content = read_bytes(key)
+    return json.loads(content) if content is not None else None
+
+
+def copy_object(src: str, dst: str):
+    """
+    Store-side copy, no content goes over the wire: a server-side S3 copy,
+    or a hard link (a file copy across filesystems) renamed into place.
+    """
+    if ARTIFACT_STORE == "local":
+        target = local_path(dst)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(target), f".tmp-{os.getpid()}-{os.path.basename(target)}")
+        try:
+            os.link(local_path(src), tmp)
+        except OSError:
+            shutil.copyfile(local_path(src), tmp)
+        os.replace(tmp, target)
+        return
+    s3_client().copy({"Bucket": MINIO_BUCKET, "Key": src}, MINIO_BUCKET, dst, Config=TRANSFER_CONFIG)
+
+
+def upload_artifacts(artifacts: Dict[str, Tuple[bytes, str]], copies: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """
+    Uploads {key: (content, content_type)} concurrently.
+    Keys in copies ({key: existing key with the same content}) are copied
+    inside the store instead of uploaded.
+    Returns seconds per key. Raises if any upload failed.
+
+    The latest.json pointer must not be part of the set: write it with
+    upload_bytes once this returns, so readers never see a version
+    whose artifacts are still uploading.
+    """
+    copies = copies or {}
+
+    def upload(key: str) -> float:
+        start = time.perf_counter()
+        if key in copies:
+            copy_object(copies[key], key)
+        else:
+            content, content_type = artifacts[key]
+            upload_bytes(key, content, content_type)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, ARTIFACT_UPLOAD_WORKERS)) as pool:
+        futures = {key: pool.submit(upload, key) for key in artifacts}
+        return {key: f.result() for key, f in futures.items()}
+
+
+def build_manifest(artifacts: Dict[str, Tuple[bytes, str]]) -> Dict[str, Any]:
+    """
+    manifest.json of a version: sha256 and size of every artifact, keyed by
+    file name. The API uses it to verify downloads and to address its local
+    artifact cache by content.
+    """
+    return {
+        "artifacts": {
+            key.rsplit("/", 1)[-1]: {
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size": len(content),
+                "content_type": content_type,
+            }
+            for key, (content, content_type) in artifacts.items()
+        }
+    }
+
+
+def manifest_artifact(base: str, artifacts: Dict[str, Tuple[bytes, str]]) -> Tuple[str, Tuple[bytes, str]]:
+    """
+    (key, (content, content_type)) of the manifest for artifacts, ready to add to the upload set.
+    """
+    manifest = build_manifest(artifacts)
+    return f"{base}/manifest.json", (json.dumps(manifest, indent=2).encode("utf-8"), "application/json")
+
+
+def unchanged_artifacts(base: str, artifacts: Dict[str, Tuple[bytes, str]], previous_base: str, previous_manifest: Optional[dict]) -> Dict[str, str]:
+    """
+    {key under base: key under previous_base} for artifacts whose sha256
+    matches the previous version's manifest; those can be copied instead of uploaded.
+    """
+    entries = (previous_manifest or {}).get("artifacts", {})
+    copies = {}
+    for key, (content, _) in artifacts.items():
+        name = key.rsplit("/", 1)[-1]
+        entry = entries.get(name)
+        if entry and entry.get("size") == len(content) and entry.get("sha256") == hashlib.sha256(content).hexdigest():
+            copies[key] = f"{previous_base}/{name}"
+    return copies
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the API: micro-benchmarks of the scoring / drift building
+blocks and a load generator against /predict and /drift/check, both writing
+JSON results that benchmarks.compare diffs between commits.
+
+Run from the repo root with the API on the path, e.g.
+    PYTHONPATH=apps/api python -m benchmarks.micro --json micro.json
+"""
@@ -0,0 +1,76 @@
+"""
+Result files shared by the benchmark suites.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def environment() -> Dict[str, Any]:
+    import pandas
+    import sklearn
+
+    return {
+        "git_commit": git_commit(),
+        "created_at_utc": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def result(suite: str, name: str, params: Dict[str, Any], metrics: Dict[str, float]) -> Dict[str, Any]:
+    """
+    One benchmark result. Metric names ending in _s / _ms / _us are lower-is-better,
+    rps is higher-is-better (see benchmarks.compare).
+    """
+    return {"suite": suite, "name": name, "params": params, "metrics": metrics}
+
+
+def write_results(path: str, suite: str, results: List[Dict[str, Any]], config: Dict[str, Any]) -> None:
+    with open(path, "w") as f:
+        json.dump({"suite": suite, "environment": environment(), "config": config, "results": results}, f, indent=2)
+
+
+def time_calls(fn: Callable[[], Any], repeat: int, min_seconds: float = 0.0) -> Dict[str, float]:
+    """
+    Calls fn repeat times (more if min_seconds hasn't passed), returns best / median seconds per call.
+    """
+    times: List[float] = []
+    started = time.perf_counter()
+    while len(times) < repeat or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": float(np.min(times)), "median_s": float(np.median(times)), "calls": len(times)}
+
+
+def latency_summary(latencies_s: List[float], elapsed_s: float) -> Dict[str, float]:
+    ms = np.asarray(latencies_s) * 1000
+    if len(ms) == 0:
+        return {"requests": 0, "rps": 0.0, "p50_ms": float("nan"), "p99_ms": float("nan")}
+    return {
+        "requests": int(len(ms)),
+        "rps": len(ms) / elapsed_s,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
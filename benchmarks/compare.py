@@ -0,0 +1,78 @@
+"""
+Compares two benchmark result files (micro or load) from different commits.
+
+Results are matched by (suite, name, params). Metrics ending in _s / _ms / _us
+are lower-is-better, rps higher-is-better; others are shown but not judged.
+Exits 1 if any judged metric got worse by more than --threshold.
+
+Usage (from repo root):
+    python -m benchmarks.compare baseline.json candidate.json
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.2 --metrics median_us median_ms rps
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+LOWER_IS_BETTER = ("_s", "_ms", "_us")
+HIGHER_IS_BETTER = ("rps",)
+
+
+def _key(r: Dict[str, Any]) -> Tuple[str, str, str]:
+    return r["suite"], r["name"], json.dumps(r.get("params", {}), sort_keys=True)
+
+
+def load(path: str) -> Dict[Tuple[str, str, str], Dict[str, float]]:
+    with open(path) as f:
+        data = json.load(f)
+    return {_key(r): r["metrics"] for r in data["results"]}
+
+
+def change(metric: str, base: float, new: float) -> Optional[float]:
+    """
+    Relative change, positive = worse; None if the metric isn't judged.
+    """
+    if not base or base != base or new != new:
+        return None
+    if metric.endswith(LOWER_IS_BETTER):
+        return (new - base) / base
+    if metric in HIGHER_IS_BETTER:
+        return (base - new) / base
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--metrics", nargs="+", help="only judge these metric names (default: all)")
+    args = parser.parse_args()
+
+    base, cand = load(args.baseline), load(args.candidate)
+    regressions = 0
+    print(f"{'benchmark':<28} {'params':<40} {'metric':<10} {'baseline':>11} {'candidate':>11} {'change':>8}")
+    for key in sorted(base.keys() & cand.keys()):
+        _, name, params = key
+        for metric, old in base[key].items():
+            if metric not in cand[key] or (args.metrics and metric not in args.metrics):
+                continue
+            new = cand[key][metric]
+            worse = change(metric, old, new)
+            flag = ""
+            if worse is not None and worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            shown = f"{worse:+.1%}" if worse is not None else "-"
+            print(f"{name:<28} {params:<40} {metric:<10} {old:>11.3f} {new:>11.3f} {shown:>8}{flag}")
+
+    for label, missing in (("baseline only", base.keys() - cand.keys()), ("candidate only", cand.keys() - base.keys())):
+        for _, name, params in sorted(missing):
+            print(f"{label}: {name} {params}")
+
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Micro-benchmarks of the scoring and drift building blocks on synthetic
+Telco-shaped data, at scaling sizes.
+
+    sanitize_features / to_dataframe / pipeline predict_proba / compiled scorer   per row
+    sanitize_frame / pipeline predict_proba                                      per batch of n rows
+    psi / cat_l1 / compute_drift                                                 reference 5000 vs current n rows
+    per-row predict_proba vs MicroBatcher                                        t client threads, req/s + latency
+
+Usage (from repo root):
+    PYTHONPATH=apps/api python -m benchmarks.micro --json micro.json
+    PYTHONPATH=apps/api python -m benchmarks.micro --quick
+"""
+import argparse
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from src.ml.batcher import MicroBatcher
+from src.ml.compiled import compile_pipeline
+from src.ml.drift import build_drift_profile, cat_l1, compute_drift, psi
+from src.ml.loader import ArtifactBundle
+from src.ml.predict import predict_proba_one, sanitize_features, sanitize_frame, to_dataframe
+
+from benchmarks.common import latency_summary, result, time_calls, write_results
+from benchmarks.synthetic import payloads, telco_frame, train_pipeline
+
+SUITE = "micro"
+
+
+def row_benchmarks(pipe, scorer, num_cols: List[str], cat_cols: List[str], repeat: int) -> List[Dict[str, Any]]:
+    raw = payloads(256, seed=7)
+    clean = [sanitize_features(p["features"], num_cols=num_cols, cat_cols=cat_cols) for p in raw]
+    X = to_dataframe(clean[0])
+    out = []
+
+    def per_row(name, fn):
+        # time a pass over all rows, report per-row cost
+        t = time_calls(lambda: [fn(i) for i in range(len(raw))], repeat)
+        per = {k: v / len(raw) * 1e6 for k, v in t.items() if k != "calls"}
+        out.append(result(SUITE, name, {"rows": 1}, {"best_us": per["best_s"], "median_us": per["median_s"]}))
+
+    per_row("sanitize_features", lambda i: sanitize_features(raw[i]["features"], num_cols=num_cols, cat_cols=cat_cols))
+    per_row("to_dataframe", lambda i: to_dataframe(clean[i]))
+    t = time_calls(lambda: pipe.predict_proba(X), repeat * 20)
+    out.append(result(SUITE, "pipeline_predict_proba", {"rows": 1}, {"best_us": t["best_s"] * 1e6, "median_us": t["median_s"] * 1e6}))
+    if scorer is not None:
+        per_row("compiled_predict_proba", lambda i: scorer.predict_proba_one(clean[i]))
+    return out
+
+
+def batch_benchmarks(pipe, num_cols: List[str], cat_cols: List[str], sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    out = []
+    for n in sizes:
+        records = [p["features"] for p in payloads(n, seed=11)]
+        X = sanitize_frame(records, num_cols=num_cols, cat_cols=cat_cols)
+        t = time_calls(lambda: sanitize_frame(records, num_cols=num_cols, cat_cols=cat_cols), repeat)
+        out.append(result(SUITE, "sanitize_frame", {"rows": n}, {"best_ms": t["best_s"] * 1e3, "median_ms": t["median_s"] * 1e3}))
+        t = time_calls(lambda: pipe.predict_proba(X), repeat)
+        out.append(result(SUITE, "pipeline_predict_proba", {"rows": n}, {"best_ms": t["best_s"] * 1e3, "median_ms": t["median_s"] * 1e3}))
+    return out
+
+
+def drift_benchmarks(reference, num_cols: List[str], cat_cols: List[str], sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    profile = build_drift_profile(reference, num_cols, cat_cols)
+    out = []
+    for n in sizes:
+        current = telco_frame(n, seed=13, shift=0.3).drop(columns=["Churn"])
+        cases = {
+            "psi": lambda: [psi(reference[c], current[c]) for c in num_cols],
+            "cat_l1": lambda: [cat_l1(reference[c], current[c]) for c in cat_cols],
+            "compute_drift": lambda: compute_drift(None, current, num_cols, cat_cols, profile=profile),
+            "compute_drift_no_profile": lambda: compute_drift(reference, current, num_cols, cat_cols),
+        }
+        for name, fn in cases.items():
+            t = time_calls(fn, repeat)
+            out.append(result(
+                SUITE, name, {"rows": n, "reference_rows": len(reference)},
+                {"best_ms": t["best_s"] * 1e3, "median_ms": t["median_s"] * 1e3},
+            ))
+    return out
+
+
+def _drive(score: Callable[[dict], float], rows: List[dict], threads: int, duration: float) -> Dict[str, float]:
+    # threads clients scoring rows back to back for duration seconds
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    deadline = time.perf_counter() + duration
+
+    def client(i: int):
+        k = i
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            score(rows[k % len(rows)])
+            latencies[i].append(time.perf_counter() - start)
+            k += threads
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latency_summary([t for lat in latencies for t in lat], time.perf_counter() - start)
+
+
+def batcher_benchmarks(pipe, num_cols: List[str], cat_cols: List[str], threads: List[int], duration: float,
+                       window_ms: float, max_rows: int) -> List[Dict[str, Any]]:
+    """
+    Concurrent single-row scoring through the sklearn pipeline, one
+    predict_proba per row vs. MicroBatcher coalescing rows across threads.
+    """
+    bundle = ArtifactBundle(
+        pointer={"model_version": "bench"},
+        pipeline=pipe,
+        schema={"num_cols": num_cols, "cat_cols": cat_cols},
+        reference=None,
+        profile={},
+    )
+    rows = [sanitize_features(p["features"], num_cols=num_cols, cat_cols=cat_cols) for p in payloads(512, seed=17)]
+    out = []
+    for t in threads:
+        m = _drive(lambda f: predict_proba_one(pipe, None, f), rows, t, duration)
+        out.append(result(SUITE, "score_per_row", {"threads": t}, m))
+
+        batcher = MicroBatcher(mode="on", window_ms=window_ms, max_rows=max_rows)
+        try:
+            m = _drive(lambda f: batcher.predict_proba_one(bundle, f), rows, t, duration)
+        finally:
+            batcher.stop()
+        m["mean_batch_size"] = batcher.stats()["mean_batch_size"]
+        out.append(result(SUITE, "score_batched", {"threads": t, "window_ms": window_ms, "max_rows": max_rows}, m))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 16, 64], help="client threads of the batcher benchmark")
+    parser.add_argument("--batch-duration", type=float, default=5.0, help="seconds per batcher run")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-rows", type=int, default=64)
+    parser.add_argument("--quick", action="store_true", help="small sizes and few repeats, for a smoke run")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.repeat = [100, 1000], 3
+        args.threads, args.batch_duration = [1, 16], 1.0
+
+    df = telco_frame(5000, seed=0)
+    pipe, num_cols, cat_cols = train_pipeline(df)
+    reference = df.drop(columns=["Churn"])
+
+    results = row_benchmarks(pipe, compile_pipeline(pipe), num_cols, cat_cols, args.repeat)
+    results += batch_benchmarks(pipe, num_cols, cat_cols, args.sizes, args.repeat)
+    results += drift_benchmarks(reference, num_cols, cat_cols, args.sizes, args.repeat)
+    timed = list(results)
+    batched = batcher_benchmarks(pipe, num_cols, cat_cols, args.threads, args.batch_duration, args.window_ms, args.max_rows)
+    results += batched
+
+    print(f"{'benchmark':<26} {'rows':>7} {'best':>12} {'median':>12}")
+    for r in timed:
+        unit = next(k.split("_", 1)[1] for k in r["metrics"] if k.startswith("best_"))
+        m = r["metrics"]
+        print(f"{r['name']:<26} {r['params']['rows']:>7} {m['best_' + unit]:>9.2f} {unit:<2} {m['median_' + unit]:>9.2f} {unit:<2}")
+
+    print(f"\n{'benchmark':<26} {'threads':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>10}")
+    for r in batched:
+        m = r["metrics"]
+        batch = f"{m['mean_batch_size']:.1f}" if "mean_batch_size" in m else "-"
+        print(f"{r['name']:<26} {r['params']['threads']:>7} {m['rps']:>9.1f} {m['p50_ms']:>8.2f} {m['p99_ms']:>8.2f} {batch:>10}")
+
+    if args.json:
+        write_results(args.json, SUITE, results, {
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "threads": args.threads,
+            "batch_duration_s": args.batch_duration,
+            "window_ms": args.window_ms,
+            "max_rows": args.max_rows,
+        })
+
+
+if __name__ == "__main__":
+    main()
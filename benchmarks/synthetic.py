@@ -0,0 +1,139 @@
+"""
+Synthetic Telco-shaped data, request payloads and a published model.
+
+Columns and value sets follow the IBM Telco churn CSV the trainer reads, so
+the pipeline, schema and drift profile have the production shapes.
+"""
+import hashlib
+import json
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.ml.drift import build_drift_profile
+
+YES_NO = ["Yes", "No"]
+INTERNET_EXTRA = ["Yes", "No", "No internet service"]
+
+CATEGORICAL: Dict[str, List[str]] = {
+    "gender": ["Female", "Male"],
+    "Partner": YES_NO,
+    "Dependents": YES_NO,
+    "PhoneService": YES_NO,
+    "MultipleLines": ["Yes", "No", "No phone service"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": INTERNET_EXTRA,
+    "OnlineBackup": INTERNET_EXTRA,
+    "DeviceProtection": INTERNET_EXTRA,
+    "TechSupport": INTERNET_EXTRA,
+    "StreamingTV": INTERNET_EXTRA,
+    "StreamingMovies": INTERNET_EXTRA,
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaperlessBilling": YES_NO,
+    "PaymentMethod": ["Electronic check", "Mailed check", "Bank transfer (automatic)", "Credit card (automatic)"],
+}
+CATEGORICAL_KEYS = list(CATEGORICAL)
+NUMERIC = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+
+
+def telco_frame(n: int, seed: int = 0, shift: float = 0.0) -> pd.DataFrame:
+    """
+    Feature columns + Churn (0/1). shift > 0 moves numeric means and
+    category mixes, for drift scenarios.
+    """
+    rng = np.random.default_rng(seed)
+    tenure = rng.integers(0, 73, n).astype(float)
+    monthly = np.round(rng.uniform(18.25, 118.75, n) + shift * 15, 2)
+    data: Dict[str, Any] = {
+        "SeniorCitizen": (rng.random(n) < 0.16).astype(float),
+        "tenure": tenure,
+        "MonthlyCharges": monthly,
+        "TotalCharges": np.round(monthly * tenure, 2),
+    }
+    for c, values in CATEGORICAL.items():
+        p = np.linspace(1.0, 1.0 + shift * 3, len(values))
+        data[c] = np.asarray(values, dtype=object)[rng.choice(len(values), n, p=p / p.sum())]
+    df = pd.DataFrame(data)
+
+    logit = -1.0 - 0.04 * tenure + 0.02 * monthly + 1.2 * (df["Contract"] == "Month-to-month")
+    df["Churn"] = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df
+
+
+def payloads(n: int, seed: int = 0, shift: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    /predict request bodies ({"features": {...}}) shaped like UI traffic:
+    some numbers as strings, the odd missing field.
+    """
+    rng = np.random.default_rng(seed + 1)
+    records = telco_frame(n, seed=seed, shift=shift).drop(columns=["Churn"]).to_dict(orient="records")
+    out = []
+    for rec in records:
+        if rng.random() < 0.1:
+            rec["TotalCharges"] = str(rec["TotalCharges"])
+        if rng.random() < 0.05:
+            rec.pop(CATEGORICAL_KEYS[int(rng.integers(len(CATEGORICAL_KEYS)))])
+        out.append({"features": rec})
+    return out
+
+
+def train_pipeline(df: pd.DataFrame) -> Tuple[Pipeline, List[str], List[str]]:
+    """
+    Same pipeline as apps/trainer/src/train.py.
+    """
+    X = df.drop(columns=["Churn"])
+    cat_cols = X.select_dtypes(include=["object"]).columns.tolist()
+    num_cols = [c for c in X.columns if c not in cat_cols]
+    pipe = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("num", Pipeline([("scaler", StandardScaler())]), num_cols),
+            ("cat", Pipeline([("oh", OneHotEncoder(handle_unknown="ignore"))]), cat_cols),
+        ])),
+        ("model", LogisticRegression(max_iter=500)),
+    ])
+    pipe.fit(X, df["Churn"])
+    return pipe, num_cols, cat_cols
+
+
+def publish_model(put: Callable[[str, bytes], None], version: str, prefix: str = "churn_model", n_train: int = 5000, seed: int = 0) -> dict:
+    """
+    Trains on synthetic data and writes the artifact layout the API loads
+    (model.joblib, metrics.json, reference.parquet, drift_profile.json,
+    manifest.json, then latest.json) through put(key, content).
+    Returns the latest.json pointer.
+    """
+    df = telco_frame(n_train, seed=seed)
+    pipe, num_cols, cat_cols = train_pipeline(df)
+    X = df.drop(columns=["Churn"])
+
+    model_buf = BytesIO()
+    joblib.dump(pipe, model_buf)
+    ref_buf = BytesIO()
+    X.sample(n=min(500, len(X)), random_state=42).to_parquet(ref_buf, index=False)
+    metrics = {"model_version": version, "n_rows": len(df), "num_cols": num_cols, "cat_cols": cat_cols}
+
+    artifacts = {
+        "model.joblib": model_buf.getvalue(),
+        "metrics.json": json.dumps(metrics).encode("utf-8"),
+        "reference.parquet": ref_buf.getvalue(),
+        "drift_profile.json": json.dumps(build_drift_profile(X, num_cols, cat_cols)).encode("utf-8"),
+    }
+    artifacts["manifest.json"] = json.dumps({
+        "artifacts": {
+            name: {"sha256": hashlib.sha256(content).hexdigest(), "size": len(content)}
+            for name, content in artifacts.items()
+        }
+    }).encode("utf-8")
+
+    for name, content in artifacts.items():
+        put(f"{prefix}/{version}/{name}", content)
+    pointer = {"model_version": version, "prefix": prefix}
+    put(f"{prefix}/latest.json", json.dumps(pointer).encode("utf-8"))
+    return pointer